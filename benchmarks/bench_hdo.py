@@ -0,0 +1,156 @@
+"""Benchmark schedule parsing, lookups and attribute rendering.
+
+Run from the repository root in a Home Assistant development environment:
+
+    python -m benchmarks.bench_hdo
+    python -m benchmarks.bench_hdo --json baseline.json
+    python -m benchmarks.bench_hdo --compare baseline.json
+
+With --compare the run fails when any case is slower than the baseline by
+more than the threshold factor.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.cez_hdo.api import CezHdoApi
+from custom_components.cez_hdo.binary_sensor import CezHdoBinarySensor
+from custom_components.cez_hdo.schedule import CEZ_TZ, signal_fingerprint
+
+from .payloads import recorded_payload, synthetic_payload
+
+# (name, signals, days, ranges per casy string)
+PAYLOADS = [
+    ("small", 3, 2, 5),
+    ("week", 3, 7, 10),
+    ("wide", 30, 7, 10),
+    ("dense", 3, 14, 100),
+]
+
+
+def measure(func: Callable[[], Any], min_time: float = 0.2, repeat: int = 5) -> dict[str, float]:
+    """Return the best time per call in microseconds and peak memory per call."""
+    # Calibrate the number of calls so that one round takes at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"us_per_op": best * 1e6, "peak_kib_per_op": (peak - baseline) / 1024}
+
+
+def build_cases() -> dict[str, Callable[[], Any]]:
+    """Return the benchmark cases by name."""
+    now = datetime.now(CEZ_TZ)
+    cases: dict[str, Callable[[], Any]] = {}
+
+    payloads = {"recorded": recorded_payload(now.date())}
+    for name, signals, days, ranges in PAYLOADS:
+        payloads[name] = synthetic_payload(signals, days, ranges, now.date())
+
+    for name, payload in payloads.items():
+        api = CezHdoApi("0" * 18)
+        signals_data = payload["data"]["signals"]
+        cases[f"parse[{name}]"] = lambda api=api, payload=payload: api._parse_response(payload)
+        cases[f"fingerprint[{name}]"] = (
+            lambda signals_data=signals_data: signal_fingerprint(signals_data, "a3b4dp01")
+        )
+
+        data = api._parse_response(payload)
+        if data.get("error_mode"):
+            raise RuntimeError(f"Payload {name} did not parse: {data['error_message']}")
+        schedule = data["schedule"]
+        # Spread lookups over the whole schedule
+        moments = [now + timedelta(minutes=7 * i) for i in range(1000)]
+
+        def _lookups(schedule=schedule, moments=moments) -> None:
+            for moment in moments:
+                schedule.state_at(moment)
+                schedule.next_transition(moment)
+
+        cases[f"lookup_x1000[{name}]"] = _lookups
+
+        # Render attributes the way the binary sensor does on a cache miss
+        entity = SimpleNamespace(_ean=api.ean, coordinator=SimpleNamespace(signal=api.signal))
+        cases[f"attributes[{name}]"] = (
+            lambda entity=entity, data=data, today=now.date():
+            CezHdoBinarySensor._build_attributes(entity, data, today)
+        )
+
+    return cases
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against the baseline")
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds per timing round")
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, dict[str, float]] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results: dict[str, dict[str, float]] = {}
+    regressions = []
+    print(f"{'case':32} {'us/op':>12} {'peak KiB/op':>12} {'vs baseline':>12}")
+    for name, func in build_cases().items():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(func, args.min_time)
+        ratio = ""
+        if name in baseline:
+            factor = result["us_per_op"] / baseline[name]["us_per_op"]
+            ratio = f"{factor:.2f}x"
+            if factor > args.threshold:
+                regressions.append(name)
+                ratio += " !"
+        print(f"{name:32} {result['us_per_op']:12.2f} {result['peak_kib_per_op']:12.1f} {ratio:>12}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if regressions:
+        print(f"Slower than baseline by more than {args.threshold}x: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Run hundreds of CEZ HDO clients against the local CEZ stand-in.
+
+Run from the repository root in a Home Assistant development environment:
+
+    python -m benchmarks.load_test --entries 500 --eans 200 --mode hub
+    python -m benchmarks.load_test --mode api --error-rate 0.2 --rounds 3
+    python -m benchmarks.load_test --mode coordinator --trace-memory --json load.json
+
+Modes:
+    api          every entry fetches with its own CezHdoApi over one pooled session
+    hub          every entry fetches through one shared CezHdoHub
+    coordinator  every entry is a CezHdoCoordinator in a bare Home Assistant
+
+The first round is a cold start, later rounds force a refresh of every
+entry. Throughput, requests seen by the server, error states and
+optionally memory per entry are reported.
+
+In the hub and coordinator modes the hub's backoff and request budget
+apply, so requests held back by them count as error states.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import aiohttp
+
+from custom_components.cez_hdo.api import CezHdoApi
+from custom_components.cez_hdo.hub import CezHdoHub
+
+from .mock_server import MockCezServer, add_settings_arguments, settings_from_args
+
+Refresh = Callable[[bool], Awaitable[dict[str, Any]]]
+
+
+def entry_keys(entries: int, eans: int, signals: int) -> list[tuple[str, str]]:
+    """Spread entries over EANs first, then over the signals of each EAN."""
+    return [
+        (f"8591824{index % eans:011d}", f"a3b4dp{(index // eans) % signals + 1:02d}")
+        for index in range(entries)
+    ]
+
+
+def create_hass(config_dir: str) -> Any:
+    """Return a bare Home Assistant instance, not started."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.core import HomeAssistant
+
+    try:
+        return HomeAssistant(config_dir)
+    except TypeError:
+        # Before 2024.2 the config directory was set afterwards
+        hass = HomeAssistant()  # pylint: disable=no-value-for-parameter
+        hass.config.config_dir = config_dir
+        return hass
+
+
+async def async_build_clients(
+    mode: str,
+    keys: list[tuple[str, str]],
+    session: aiohttp.ClientSession,
+    api_url: str,
+) -> tuple[list[Refresh], Callable[[], Awaitable[None]], CezHdoHub | None]:
+    """Create one client per entry.
+
+    Returns a refresh function per entry, a cleanup coroutine function and
+    the shared hub, if any.
+    """
+    if mode == "coordinator":
+        return await async_build_coordinators(keys, session, api_url)
+
+    hub = CezHdoHub(session, api_url) if mode == "hub" else None
+    apis = [
+        CezHdoApi(ean, signal, hub, session=session, api_url=api_url) for ean, signal in keys
+    ]
+
+    def _refresh(api: CezHdoApi) -> Refresh:
+        return lambda force: api.async_get_data(force_refresh=force)
+
+    async def _cleanup() -> None:
+        for api in apis:
+            await api.async_close()
+
+    return [_refresh(api) for api in apis], _cleanup, hub
+
+
+async def async_build_coordinators(
+    keys: list[tuple[str, str]],
+    session: aiohttp.ClientSession,
+    api_url: str,
+) -> tuple[list[Refresh], Callable[[], Awaitable[None]], CezHdoHub | None]:
+    """Create coordinators in a bare Home Assistant instance."""
+    # pylint: disable=import-outside-toplevel
+    from custom_components.cez_hdo.const import CONF_EAN, CONF_SIGNAL, DATA_HUB
+    from custom_components.cez_hdo.coordinator import CezHdoCoordinator
+
+    config_dir = tempfile.TemporaryDirectory()
+    hass = create_hass(config_dir.name)
+
+    # Coordinators pick up this hub instead of creating one for CEZ
+    hub = hass.data[DATA_HUB] = CezHdoHub(session, api_url)
+    coordinators = [
+        CezHdoCoordinator(hass, {CONF_EAN: ean, CONF_SIGNAL: signal}) for ean, signal in keys
+    ]
+
+    def _refresh(coordinator: CezHdoCoordinator) -> Refresh:
+        async def _async_refresh(force: bool) -> dict[str, Any]:
+            if force:
+                # The background refresh path of a running installation
+                await coordinator.async_revalidate()
+            else:
+                await coordinator.async_refresh()
+            return coordinator.data or {}
+
+        return _async_refresh
+
+    async def _cleanup() -> None:
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        config_dir.cleanup()
+
+    return [_refresh(coordinator) for coordinator in coordinators], _cleanup, hub
+
+
+async def async_run_round(
+    refreshes: list[Refresh], force: bool, concurrency: int
+) -> dict[str, Any]:
+    """Refresh every entry once, at most concurrency at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: list[float] = []
+    errors = 0
+
+    async def _one(refresh: Refresh) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                data = await refresh(force)
+            except Exception:  # pylint: disable=broad-except
+                data = {"error_mode": True}
+            durations.append(time.perf_counter() - started)
+            if data.get("error_mode"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(refresh) for refresh in refreshes))
+    elapsed = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        "seconds": round(elapsed, 3),
+        "refreshes_per_second": round(len(refreshes) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(durations) * 1000, 1),
+        "p95_ms": round(durations[int(len(durations) * 0.95) - 1] * 1000, 1),
+        "error_states": errors,
+    }
+
+
+async def async_load_test(args: argparse.Namespace) -> dict[str, Any]:
+    """Start the stand-in, run all rounds and collect the results."""
+    server = MockCezServer(settings_from_args(args))
+    api_url = await server.async_start()
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    keys = entry_keys(args.entries, args.eans, args.signals)
+
+    results: dict[str, Any] = {
+        "mode": args.mode,
+        "entries": args.entries,
+        "eans": len({ean for ean, _ in keys}),
+        "rounds": [],
+    }
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            if args.trace_memory:
+                # Generate the responses up front, so they do not count as
+                # memory of the entries
+                for ean in {ean for ean, _ in keys}:
+                    server.payload(ean)
+                tracemalloc.start()
+                baseline, _ = tracemalloc.get_traced_memory()
+
+            refreshes, cleanup, hub = await async_build_clients(
+                args.mode, keys, session, api_url
+            )
+            try:
+                for index in range(args.rounds):
+                    requests_before = server.requests
+                    result = await async_run_round(refreshes, index > 0, args.concurrency)
+                    result["server_requests"] = server.requests - requests_before
+                    results["rounds"].append(result)
+                    if index == 0 and args.trace_memory:
+                        current, _ = tracemalloc.get_traced_memory()
+                        results["kib_per_entry"] = round(
+                            (current - baseline) / 1024 / args.entries, 2
+                        )
+                    if args.pause and index < args.rounds - 1:
+                        await asyncio.sleep(args.pause)
+                if hub is not None:
+                    results["hub"] = hub.stats
+            finally:
+                await cleanup()
+                if args.trace_memory:
+                    tracemalloc.stop()
+    finally:
+        await server.async_stop()
+
+    results["server"] = server.stats
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("--mode", choices=["api", "hub", "coordinator"], default="hub")
+    parser.add_argument("--entries", type=int, default=300, help="number of config entries")
+    parser.add_argument("--eans", type=int, default=100, help="distinct EANs among the entries")
+    parser.add_argument("--rounds", type=int, default=3, help="refresh rounds, the first is cold")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between rounds")
+    parser.add_argument("--concurrency", type=int, default=1000,
+                        help="entries refreshing at the same time")
+    parser.add_argument("--connections", type=int, default=100,
+                        help="connection pool size of the shared session")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure memory per entry after the first round (slower)")
+    parser.add_argument("--json", help="write results to this file")
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(async_load_test(args))
+
+    print(f"mode={results['mode']} entries={results['entries']} eans={results['eans']}")
+    print(f"{'round':>5} {'seconds':>9} {'refresh/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'errors':>7} {'requests':>9}")
+    for index, result in enumerate(results["rounds"]):
+        print(f"{index:5} {result['seconds']:9.3f} {result['refreshes_per_second']:10.1f} "
+              f"{result['p50_ms']:9.1f} {result['p95_ms']:9.1f} "
+              f"{result['error_states']:7} {result['server_requests']:9}")
+    if "kib_per_entry" in results:
+        print(f"memory per entry: {results['kib_per_entry']} KiB")
+    if "hub" in results:
+        print(f"hub: {results['hub']}")
+    print(f"server: {results['server']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Local stand-in for the CEZ switch-times endpoint.
+
+Serves synthetic responses on the same path and query as CEZ_API_URL and
+CEZ_API_ENDPOINT, with configurable latency, errors, payload size and
+schedule changes. It only needs aiohttp, not Home Assistant, and runs on
+its own from the repository root:
+
+    python -m benchmarks.mock_server --port 8099 --latency 0.2 --error-rate 0.05
+
+and point a client at it with api_url=f"http://127.0.0.1:8099{MOCK_PATH}".
+Request counters are served as JSON on /stats.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import random
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+from .payloads import synthetic_payload
+
+
+def _load_const() -> ModuleType:
+    """Load the integration constants by path.
+
+    Importing them through the package would run its __init__, which
+    needs Home Assistant.
+    """
+    path = Path(__file__).parents[1] / "custom_components" / "cez_hdo" / "const.py"
+    spec = importlib.util.spec_from_file_location("cez_hdo_const", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_CONST = _load_const()
+CEZ_API_URL: str = _CONST.CEZ_API_URL
+CEZ_API_ENDPOINT: str = _CONST.CEZ_API_ENDPOINT
+CEZ_TZ = ZoneInfo(_CONST.CEZ_TIMEZONE)
+
+MOCK_PATH = urlparse(CEZ_API_URL).path
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the stand-in server."""
+
+    latency: float = 0.05  # seconds before every answer
+    jitter: float = 0.0  # extra random latency, up to this many seconds
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 503
+    hang_rate: float = 0.0  # share of requests that never answer in time
+    signals: int = 3  # signals per EAN, a3b4dp01, a3b4dp02, ...
+    days: int = 2  # days per signal, starting today
+    ranges: int = 5  # low tariff ranges per day
+    change_every: float = 0.0  # seconds between schedule changes, 0 for never
+    seed: int = 0
+
+
+class MockCezServer:
+    """aiohttp application answering like the CEZ API."""
+
+    def __init__(self, settings: MockSettings | None = None) -> None:
+        """Initialize the server, not yet listening."""
+        self.settings = settings or MockSettings()
+        self.app = web.Application()
+        self.app.router.add_post(MOCK_PATH, self._handle_signals)
+        self.app.router.add_get("/stats", self._handle_stats)
+        self._runner: web.AppRunner | None = None
+        self._rng = random.Random(self.settings.seed)
+        self._started = time.monotonic()
+        self._payloads: dict[str, tuple[int, bytes]] = {}
+        self.requests = 0
+        self.statuses: dict[str, int] = {}
+        self.bytes_sent = 0
+        self.eans: set[str] = set()
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the URL to use as api_url."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}{MOCK_PATH}"
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def generation(self) -> int:
+        """Return how many times the schedules have changed so far."""
+        if not self.settings.change_every:
+            return 0
+        return int((time.monotonic() - self._started) // self.settings.change_every)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return request counters."""
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "eans": len(self.eans),
+            "generation": self.generation,
+        }
+
+    def payload(self, ean: str) -> bytes:
+        """Return the encoded response for an EAN in the current generation.
+
+        Every EAN gets its own schedule, regenerated on each change.
+        """
+        generation = self.generation
+        cached = self._payloads.get(ean)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        settings = self.settings
+        data = synthetic_payload(
+            settings.signals,
+            settings.days,
+            settings.ranges,
+            datetime.now(CEZ_TZ).date(),
+            seed=zlib.crc32(ean.encode()) ^ settings.seed ^ generation,
+        )
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self._payloads[ean] = (generation, body)
+        return body
+
+    def _count(self, status: int) -> None:
+        """Count one answered request."""
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    async def _handle_signals(self, request: web.Request) -> web.Response:
+        """Answer a switch-times request."""
+        self.requests += 1
+        if request.query.get("path") != CEZ_API_ENDPOINT:
+            self._count(404)
+            raise web.HTTPNotFound()
+        try:
+            ean = str((await request.json(content_type=None))["ean"])
+        except (ValueError, KeyError, TypeError):
+            self._count(400)
+            raise web.HTTPBadRequest() from None
+        self.eans.add(ean)
+
+        settings = self.settings
+        delay = settings.latency + self._rng.uniform(0, settings.jitter)
+        if self._rng.random() < settings.hang_rate:
+            # Longer than the client timeout of 30 s
+            delay = 60
+        await asyncio.sleep(delay)
+
+        if self._rng.random() < settings.error_rate:
+            self._count(settings.error_status)
+            return web.Response(status=settings.error_status, text="Service Unavailable")
+
+        body = self.payload(ean)
+        self.bytes_sent += len(body)
+        self._count(200)
+        return web.Response(body=body, content_type="application/json")
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        """Serve the request counters."""
+        return web.json_response(self.stats)
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one option per MockSettings field."""
+    for name, value in asdict(MockSettings()).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(value), default=value,
+            help=f"mock server {name.replace('_', ' ')} (default {value})",
+        )
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    """Build MockSettings from parsed options."""
+    return MockSettings(**{name: getattr(args, name) for name in asdict(MockSettings())})
+
+
+async def async_serve(settings: MockSettings, host: str, port: int) -> None:
+    """Serve until cancelled."""
+    server = MockCezServer(settings)
+    url = await server.async_start(host, port)
+    print(f"Serving CEZ stand-in on {url}?path={CEZ_API_ENDPOINT}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.async_stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the stand-in server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(async_serve(settings_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
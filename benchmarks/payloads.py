@@ -0,0 +1,65 @@
+"""Recorded and synthetic CEZ API payloads for benchmarks."""
+from __future__ import annotations
+
+import json
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+FIXTURES = Path(__file__).parent / "fixtures"
+DATE_FORMAT = "%d.%m.%Y"
+DAY_NAMES = ["Pondělí", "Úterý", "Středa", "Čtvrtek", "Pátek", "Sobota", "Neděle"]
+
+
+def recorded_payload(start: date | None = None) -> dict[str, Any]:
+    """Load the sample response, shifted so that its first day is start."""
+    data = json.loads((FIXTURES / "signals_sample.json").read_text(encoding="utf-8"))
+    signals = data["data"]["signals"]
+    first = min(datetime.strptime(entry["datum"], DATE_FORMAT).date() for entry in signals)
+    shift = (start or date.today()) - first
+    for entry in signals:
+        day = datetime.strptime(entry["datum"], DATE_FORMAT).date() + shift
+        entry["datum"] = day.strftime(DATE_FORMAT)
+        entry["den"] = DAY_NAMES[day.weekday()]
+    return data
+
+
+def synthetic_casy(rng: random.Random, ranges: int) -> str:
+    """Return a casy string with the given number of disjoint ranges."""
+    # Pick 2 * ranges distinct minute marks in 0..1440 and pair them up
+    marks = sorted(rng.sample(range(0, 1441, 5), ranges * 2))
+    parts = []
+    for start, end in zip(marks[::2], marks[1::2]):
+        parts.append(f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}")
+    return ";   ".join(parts)
+
+
+def synthetic_payload(
+    signals: int = 3,
+    days: int = 7,
+    ranges: int = 5,
+    start: date | None = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Build a response shaped like data.signals[] of the CEZ API.
+
+    The first signal is always a3b4dp01 so that the default configuration
+    finds its data.
+    """
+    rng = random.Random(seed)
+    start = start or date.today()
+    entries = []
+    for index in range(signals):
+        signal = f"a3b4dp{index + 1:02d}"
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            entries.append(
+                {
+                    "signal": signal,
+                    "den": DAY_NAMES[day.weekday()],
+                    "datum": day.strftime(DATE_FORMAT),
+                    "casy": synthetic_casy(rng, ranges),
+                }
+            )
+    return {"data": {"signals": entries}, "statusCode": 200, "flashMessages": []}
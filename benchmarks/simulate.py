@@ -0,0 +1,450 @@
+"""Replay recorded CEZ payloads through the integration in virtual time.
+
+Run from the repository root in a Home Assistant development environment:
+
+    python -m benchmarks.simulate --start 2026-10-23 --days 7
+    python -m benchmarks.simulate --payloads recorded/ --outage 2026-10-25T23:30/2026-10-26T02:00
+    python -m benchmarks.simulate --days 3 --events events.jsonl
+    python -m benchmarks.simulate --days 2 --timeline
+
+The API client, hub, coordinator and binary sensor run unchanged, but read
+the time from a virtual clock and arm their timers on it. With --timeline
+the minute tick of the schedule sensors runs on it as well, one wakeup
+per simulated minute. Refreshes requested by the coordinator run without
+the real time cooldown, so runs are repeatable. The driver jumps
+from timer to timer, so a week of switching takes seconds. Upstream
+requests are answered from the recorded payloads, publishing each day's
+schedule like CEZ does: today's all day, tomorrow's from --publish-hour.
+
+Every fetch, timer wakeup and state transition of the binary sensor is
+reported, together with the switch latency against the recorded schedule
+and the minutes the sensor spent in the wrong state. The hourly safety
+poll is simulated too. The energy sensors are not, as they read the
+recorder's statistics.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Callable, Collection
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+
+from custom_components.cez_hdo.api import CezHdoApiError
+from custom_components.cez_hdo.binary_sensor import CezHdoBinarySensor
+from custom_components.cez_hdo.const import CONF_EAN, CONF_SIGNAL, DATA_HUB, DEFAULT_SIGNAL
+from custom_components.cez_hdo.coordinator import CezHdoCoordinator, HassClock
+from custom_components.cez_hdo.hub import CezHdoHub
+from custom_components.cez_hdo.metrics import FetchMetrics
+from custom_components.cez_hdo.schedule import (
+    CEZ_TZ,
+    DATE_FORMAT,
+    HdoSchedule,
+    parse_signals,
+    to_minute,
+)
+
+from .load_test import create_hass
+from .payloads import recorded_payload
+
+_LOGGER = logging.getLogger(__name__)
+
+SIMULATED_EAN = "859182400000000000"
+
+
+class VirtualClock(HassClock):
+    """Virtual time with timers kept in a heap instead of the event loop."""
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize the clock at start."""
+        self._now = start
+        self._timers: list[list[Any]] = []
+        self._sequence = itertools.count()
+
+    def now(self) -> datetime:
+        """Return the virtual time."""
+        return self._now
+
+    def monotonic(self) -> float:
+        """Return the virtual time in seconds, for the hub and throttles."""
+        return self._now.timestamp()
+
+    @callback
+    def async_track_point_in_time(
+        self, hass: HomeAssistant, action: Callable[[datetime], Any], point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Arm a virtual timer."""
+        # [when, tie breaker, action, cancelled]
+        timer = [point_in_time, next(self._sequence), action, False]
+        heapq.heappush(self._timers, timer)
+
+        @callback
+        def _cancel() -> None:
+            timer[3] = True
+
+        return _cancel
+
+    @callback
+    def async_track_time_change(
+        self,
+        hass: HomeAssistant,
+        action: Callable[[datetime], Any],
+        minute: int | None = None,
+        second: int = 0,
+    ) -> CALLBACK_TYPE:
+        """Arm a virtual timer every minute, or every hour at minute.
+
+        Steps are taken in UTC. Home Assistant matches the pattern against
+        local time, which only differs for hourly timers in time zones with
+        a fractional hour offset.
+        """
+        step = timedelta(minutes=1) if minute is None else timedelta(hours=1)
+        unsub: CALLBACK_TYPE | None = None
+
+        def _next(after: datetime) -> datetime:
+            point = after.astimezone(timezone.utc).replace(second=second, microsecond=0)
+            if minute is not None:
+                point = point.replace(minute=minute)
+            while point <= after:
+                point += step
+            return point
+
+        @callback
+        def _handle_time_change(now: datetime) -> None:
+            nonlocal unsub
+            unsub = self.async_track_point_in_time(hass, _handle_time_change, _next(now))
+            action(now)
+
+        unsub = self.async_track_point_in_time(hass, _handle_time_change, _next(self._now))
+
+        @callback
+        def _cancel() -> None:
+            if unsub is not None:
+                unsub()
+
+        return _cancel
+
+    def pop(self, until: datetime) -> tuple[datetime, Callable[[datetime], Any]] | None:
+        """Advance to the next live timer before until and return it."""
+        while self._timers and self._timers[0][0] < until:
+            when, _, action, cancelled = heapq.heappop(self._timers)
+            if not cancelled:
+                self._now = max(self._now, when)
+                return when, action
+        self._now = max(self._now, until)
+        return None
+
+
+class ReplaySource:
+    """Recorded CEZ entries by date, published day by day."""
+
+    def __init__(
+        self,
+        entries: list[dict[str, Any]],
+        published_days: int,
+        publish_hour: int,
+        outages: list[tuple[datetime, datetime]],
+    ) -> None:
+        """Initialize from every recorded data.signals[] entry."""
+        self.by_date: dict[date, list[dict[str, Any]]] = {}
+        for entry in entries:
+            day = datetime.strptime(entry["datum"], DATE_FORMAT).date()
+            self.by_date.setdefault(day, []).append(entry)
+        self.entries = entries
+        self.published_days = published_days
+        self.publish_hour = publish_hour
+        self.outages = outages
+
+    def response(self, now: datetime, signals: Collection[str] | None) -> dict[str, Any]:
+        """Return what CEZ would answer at now."""
+        local = now.astimezone(CEZ_TZ)
+        days = self.published_days if local.hour >= self.publish_hour else self.published_days - 1
+        entries = [
+            entry
+            for offset in range(max(days, 1))
+            for entry in self.by_date.get(local.date() + timedelta(days=offset), ())
+            if signals is None or entry["signal"] in signals
+        ]
+        return {"data": {"signals": entries}, "statusCode": 200}
+
+    def in_outage(self, now: datetime) -> bool:
+        """Return True if requests fail at now."""
+        return any(start <= now < end for start, end in self.outages)
+
+
+class ReplayHub(CezHdoHub):
+    """Hub answering upstream requests from a ReplaySource."""
+
+    def __init__(self, source: ReplaySource, clock: VirtualClock, log: Callable[..., None]) -> None:
+        """Initialize the hub on the virtual clock."""
+        super().__init__(None, clock=clock.monotonic)  # type: ignore[arg-type]
+        self._source = source
+        self._virtual = clock
+        self._log = log
+
+    async def _async_request(
+        self, ean: str, signals: frozenset[str] | None, metrics: FetchMetrics | None
+    ) -> dict[str, Any]:
+        """Answer from the recorded payloads."""
+        now = self._virtual.now()
+        if self._source.in_outage(now):
+            self._log("fetch", ok=False)
+            raise CezHdoApiError("Simulated outage")
+        self._log("fetch", ok=True)
+        return self._source.response(now, signals)
+
+
+class Simulation:
+    """Drive one coordinator and its binary sensor through virtual time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        source: ReplaySource,
+        signal: str,
+        start: datetime,
+        timeline: bool = False,
+    ) -> None:
+        """Set up the virtual clock, the replay hub, the coordinator and the sensor."""
+        self.hass = hass
+        self.clock = VirtualClock(start)
+        self.events: list[dict[str, Any]] = []
+        hass.data[DATA_HUB] = ReplayHub(source, self.clock, self._log)
+        # Requested refreshes run right away instead of after a real cooldown
+        self.coordinator = CezHdoCoordinator(
+            hass,
+            {CONF_EAN: SIMULATED_EAN, CONF_SIGNAL: signal},
+            self.clock,
+            Debouncer(hass, _LOGGER, cooldown=0, immediate=True),
+        )
+        self.sensor = CezHdoBinarySensor(self.coordinator, None)  # type: ignore[arg-type]
+        self.truth: HdoSchedule | None = parse_signals(source.entries, signal)
+        self.transitions: list[tuple[int, bool | None]] = []
+        self._state: bool | None = None
+        self._timeline = timeline
+        self.minute_ticks = 0
+        self.unknown_next_24h = 0
+
+    def _log(self, event: str, **details: Any) -> None:
+        """Record an event at the virtual time."""
+        self.events.append({"time": self.clock.now().isoformat(), "event": event, **details})
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Record state transitions of the binary sensor."""
+        state = self.sensor.is_on
+        # Render attributes like a state write would
+        self.sensor.extra_state_attributes  # pylint: disable=pointless-statement
+        if state == self._state:
+            return
+        self._state = state
+        now = self.clock.now()
+        self.transitions.append((to_minute(now), state))
+        details: dict[str, Any] = {"state": state}
+        if self.truth is not None and self.truth.covers(now):
+            index = bisect_right(self.truth.bounds, to_minute(now))
+            if index:
+                details["latency_s"] = round(now.timestamp() - self.truth.bounds[index - 1] * 60, 3)
+            details["expected"] = index % 2 == 1
+        self._log("transition", **details)
+
+    @callback
+    def _async_handle_minute(self) -> None:
+        """Read the schedule sensor values like their minute tick does."""
+        self.minute_ticks += 1
+        if self.coordinator.timeline_values().get("low_minutes_next_24h") is None:
+            self.unknown_next_24h += 1
+
+    @callback
+    def _async_poll(self, _now: datetime) -> None:
+        """Run the coordinator's safety net poll and arm the next one."""
+        self.hass.async_create_task(self.coordinator.async_refresh())
+        self.clock.async_track_point_in_time(
+            self.hass, self._async_poll, self.clock.now() + self.coordinator.update_interval
+        )
+
+    async def _async_settle(self) -> None:
+        """Let every task started by a wakeup finish."""
+        try:
+            await self.hass.async_block_till_done(wait_background_tasks=True)
+        except TypeError:
+            # Before 2024.3 background tasks were always waited for
+            await self.hass.async_block_till_done()
+
+    async def async_run(self, end: datetime) -> None:
+        """Start the coordinator like setup does and replay until end."""
+        self.coordinator.async_add_listener(self._async_handle_update)
+        if self._timeline:
+            self.coordinator.async_add_minute_listener(self._async_handle_minute)
+        await self.coordinator.async_refresh()
+        self.coordinator.async_schedule_prefetch()
+        self.clock.async_track_point_in_time(
+            self.hass, self._async_poll, self.clock.now() + self.coordinator.update_interval
+        )
+        await self._async_settle()
+
+        while (timer := self.clock.pop(end)) is not None:
+            when, action = timer
+            name = getattr(action, "__name__", "timer").strip("_")
+            self._log("wakeup", kind=name.replace("async_handle_", "").replace("handle_", ""),
+                      scheduled=when.isoformat())
+            result = action(when)
+            if asyncio.iscoroutine(result):
+                await result
+            await self._async_settle()
+
+        await self.coordinator.async_shutdown()
+
+    def minutes_wrong(self, start: datetime, end: datetime) -> int:
+        """Return the minutes the sensor state differed from the recording."""
+        if self.truth is None:
+            return 0
+        times = [minute for minute, _ in self.transitions]
+        wrong = 0
+        for minute in range(to_minute(start), to_minute(end)):
+            index = bisect_right(times, minute)
+            state = self.transitions[index - 1][1] if index else None
+            if state != (bisect_right(self.truth.bounds, minute) % 2 == 1):
+                wrong += 1
+        return wrong
+
+    def summary(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Summarize the run."""
+        fetches = [event for event in self.events if event["event"] == "fetch"]
+        latencies = [
+            event["latency_s"]
+            for event in self.events
+            if event["event"] == "transition" and "latency_s" in event
+        ]
+        hub: CezHdoHub = self.hass.data[DATA_HUB]
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "fetches": len(fetches),
+            "failed_fetches": sum(not event["ok"] for event in fetches),
+            "fetch_hours": dict(
+                sorted(Counter(event["time"][11:13] for event in fetches).items())
+            ),
+            "wakeups": dict(
+                Counter(event["kind"] for event in self.events if event["event"] == "wakeup")
+            ),
+            "transitions": len(self.transitions),
+            "max_latency_s": max(latencies, default=None),
+            "mean_latency_s": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "minutes_wrong": self.minutes_wrong(start, end),
+            **(
+                {"minute_ticks": self.minute_ticks, "unknown_next_24h": self.unknown_next_24h}
+                if self._timeline
+                else {}
+            ),
+            "hub": hub.stats,
+        }
+
+
+def load_entries(path: str | None, start: date, days: int) -> list[dict[str, Any]]:
+    """Return recorded entries from a directory of responses or the sample.
+
+    Without a directory the sample response is repeated week by week, so
+    any number of days can be replayed. Later files win for the same date.
+    """
+    if path is None:
+        entries = []
+        for week in range(days // 7 + 2):
+            entries.extend(recorded_payload(start + timedelta(days=7 * week))["data"]["signals"])
+        return entries
+
+    latest: dict[tuple[str, str], dict[str, Any]] = {}
+    for file in sorted(Path(path).glob("*.json")):
+        for entry in json.loads(file.read_text(encoding="utf-8"))["data"]["signals"]:
+            latest[(entry["signal"], entry["datum"])] = entry
+    return list(latest.values())
+
+
+def parse_outage(value: str) -> tuple[datetime, datetime]:
+    """Parse START/END in CEZ local time."""
+    start, end = (datetime.fromisoformat(part) for part in value.split("/", 1))
+    return (
+        start if start.tzinfo else start.replace(tzinfo=CEZ_TZ),
+        end if end.tzinfo else end.replace(tzinfo=CEZ_TZ),
+    )
+
+
+async def async_simulate(args: argparse.Namespace) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Run one simulation and return its summary and events."""
+    random.seed(args.seed)
+    start_day = date.fromisoformat(args.start) if args.start else datetime.now(CEZ_TZ).date()
+    start = datetime.combine(start_day, datetime.min.time(), CEZ_TZ) + timedelta(
+        hours=args.start_hour
+    )
+    end = start + timedelta(days=args.days)
+    source = ReplaySource(
+        load_entries(args.payloads, start_day, args.days),
+        args.published_days,
+        args.publish_hour,
+        [parse_outage(value) for value in args.outage],
+    )
+
+    config_dir = tempfile.TemporaryDirectory()
+    hass = create_hass(config_dir.name)
+    try:
+        simulation = Simulation(hass, source, args.signal, start, args.timeline)
+        await simulation.async_run(end)
+        return simulation.summary(start, end), simulation.events
+    finally:
+        await hass.async_stop(force=True)
+        config_dir.cleanup()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the simulation."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("--start", help="first simulated day, YYYY-MM-DD (default today)")
+    parser.add_argument("--start-hour", type=float, default=0.5,
+                        help="local hour the installation starts at")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--signal", default=DEFAULT_SIGNAL)
+    parser.add_argument("--payloads", help="directory of recorded JSON responses")
+    parser.add_argument("--published-days", type=int, default=2,
+                        help="days in a response once tomorrow is published")
+    parser.add_argument("--publish-hour", type=int, default=14,
+                        help="local hour from which tomorrow is published")
+    parser.add_argument("--outage", action="append", default=[],
+                        help="START/END in local ISO time during which requests fail")
+    parser.add_argument("--seed", type=int, default=0, help="seed for all jitter")
+    parser.add_argument("--timeline", action="store_true",
+                        help="also tick the schedule sensors every simulated minute")
+    parser.add_argument("--events", help="write every event to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summary, events = asyncio.run(async_simulate(args))
+    summary["real_seconds"] = round(time.perf_counter() - started, 3)
+
+    if args.events:
+        with open(args.events, "w", encoding="utf-8") as file:
+            for event in events:
+                file.write(json.dumps(event) + "\n")
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["minutes_wrong"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
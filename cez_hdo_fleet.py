@@ -0,0 +1,32 @@
+"""Run the CEZ HDO fleet fetcher without Home Assistant installed.
+
+The integration package imports Home Assistant when it is loaded, so its
+Home Assistant independent modules are loaded here without running the
+package __init__. See custom_components/cez_hdo/fleet.py for the options.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE = "custom_components.cez_hdo"
+PACKAGE_DIR = Path(__file__).resolve().parent / "custom_components" / "cez_hdo"
+
+
+def load_fleet() -> types.ModuleType:
+    """Import the fleet module, bypassing the integration's __init__."""
+    if PACKAGE not in sys.modules:
+        for name, path in (
+            ("custom_components", PACKAGE_DIR.parent),
+            (PACKAGE, PACKAGE_DIR),
+        ):
+            module = types.ModuleType(name)
+            module.__path__ = [str(path)]
+            sys.modules.setdefault(name, module)
+    return importlib.import_module(f"{PACKAGE}.fleet")
+
+
+if __name__ == "__main__":
+    sys.exit(load_fleet().main())
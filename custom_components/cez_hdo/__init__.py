@@ -3,29 +3,87 @@ from __future__ import annotations
 
 import logging
 from datetime import timedelta
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
-from .coordinator import CezHdoCoordinator
+from .const import CONF_EAN, CONF_SIGNAL, DATA_HUB, DEFAULT_SIGNAL, DOMAIN
+from .coordinator import CezHdoCoordinator, entry_unique_id
+from .push import async_forget_timeline, async_register_push_view
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the CEZ HDO services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up CEZ HDO from a config entry."""
-    coordinator = CezHdoCoordinator(hass, entry.data)
+    coordinator = CezHdoCoordinator(hass, {**entry.data, **entry.options})
 
-    await coordinator.async_config_entry_first_refresh()
+    # Start from the stored schedule and revalidate it in the background,
+    # only wait for the network when there is nothing usable on disk
+    if await coordinator.async_restore():
+        coordinator.async_start_revalidate()
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    coordinator.async_schedule_prefetch()
+    if coordinator.push_endpoint:
+        async_register_push_view(hass)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    return True
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate entries from one per EAN to one per EAN and signal."""
+    if entry.version > 2:
+        return False
+
+    if entry.version == 1:
+        ean = entry.data[CONF_EAN]
+        signal = entry.data.get(CONF_SIGNAL, DEFAULT_SIGNAL)
+
+        @callback
+        def _migrate_unique_id(entity: er.RegistryEntry) -> dict[str, Any] | None:
+            # Entity IDs are kept, only the signal is added to the unique IDs
+            if entity.unique_id.endswith(f"_{ean}"):
+                return {"new_unique_id": f"{entity.unique_id}_{signal}"}
+            return None
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+
+        unique_id = entry_unique_id(ean, signal)
+        try:
+            hass.config_entries.async_update_entry(entry, unique_id=unique_id, version=2)
+        except TypeError:
+            # Before 2024.3 the version was set directly
+            entry.version = 2
+            hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+        _LOGGER.debug("Migrated CEZ HDO entry %s to version 2", entry.entry_id)
 
     return True
 
@@ -33,6 +91,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: CezHdoCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        # The options may switch the endpoint off, reloads start without a cache
+        async_forget_timeline(hass, coordinator)
+
+        if not hass.data[DOMAIN]:
+            hass.data.pop(DATA_HUB, None)
 
     return unload_ok
@@ -2,54 +2,279 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
 import json
 import logging
-from datetime import datetime, timedelta, time
-from typing import Any
+import time
+from collections.abc import Callable, Collection
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 
-from .const import CEZ_API_ENDPOINT, CEZ_API_URL, CEZ_HEADERS
+from .const import (
+    CEZ_API_ENDPOINT,
+    CEZ_API_URL,
+    CEZ_HEADERS,
+    COMBINE_MODE_INTERSECTION,
+    COMBINE_MODE_UNION,
+    REQUEST_TIMEOUT,
+    SCHEDULE_MAX_AGE,
+    STREAM_CHUNK_SIZE,
+)
+from .metrics import CezHdoMetrics, FetchMetrics
+from .schedule import HdoSchedule, cez_now, from_minute, parse_signals, signal_fingerprint
+
+if TYPE_CHECKING:
+    from .hub import CezHdoHub
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class CezHdoApiError(Exception):
+    """Error to indicate the CEZ API answered with an error status."""
+
+
+class CezHdoRequestDeferred(CezHdoApiError):
+    """Error to indicate a request was held back by backoff or budget."""
+
+    def __init__(self, message: str, retry_in: float) -> None:
+        """Initialize with the seconds until a retry is allowed."""
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class SignalStreamFilter:
+    """Incrementally extract data.signals[] entries of selected signals.
+
+    The response body is fed chunk by chunk. Entries of the signals array
+    are decoded one at a time as soon as they are complete, and entries of
+    other signals are dropped immediately, so memory depends on the kept
+    signals rather than on the size of the whole document.
+    """
+
+    def __init__(self, signals: Collection[str]) -> None:
+        """Initialize the filter for the given signal names."""
+        self._signals = frozenset(signals)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+        self.entries: list[dict[str, Any]] = []
+        self.bytes_received = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the response body."""
+        self.bytes_received += len(chunk)
+        if self._done:
+            return
+        self._buffer += self._decoder.decode(chunk)
+        self._consume(final=False)
+
+    def result(self) -> dict[str, Any]:
+        """Finish the stream and return the filtered response."""
+        if not self._done:
+            # The rest of the document is not decoded once the array ended
+            self._buffer += self._decoder.decode(b"", final=True)
+            self._consume(final=True)
+        return {"data": {"signals": self.entries}}
+
+    def _consume(self, final: bool) -> None:
+        """Decode every complete entry in the buffer."""
+        buffer = self._buffer
+        pos = 0
+
+        if not self._in_array:
+            key = buffer.find('"signals"')
+            if key < 0:
+                # Keep a tail long enough to hold a key split across chunks
+                self._buffer = buffer[-len('"signals"'):]
+                return
+            bracket = buffer.find("[", key)
+            if bracket < 0:
+                self._buffer = buffer[key:]
+                return
+            self._in_array = True
+            pos = bracket + 1
+
+        length = len(buffer)
+        while True:
+            while pos < length and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= length:
+                break
+            if buffer[pos] == "]":
+                self._done = True
+                pos = length
+                break
+            try:
+                entry, end = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # Entry not complete yet, wait for more data
+                break
+            if isinstance(entry, dict) and entry.get("signal") in self._signals:
+                self.entries.append(entry)
+            pos = end
+
+        self._buffer = buffer[pos:]
+
+
+async def async_fetch_signals(
+    session: aiohttp.ClientSession,
+    ean: str,
+    signals: Collection[str] | None = None,
+    metrics: FetchMetrics | None = None,
+    api_url: str = CEZ_API_URL,
+    timeout: float = REQUEST_TIMEOUT,
+) -> dict[str, Any]:
+    """Download the raw switch times of one EAN.
+
+    When signals are given the body is streamed through SignalStreamFilter
+    and only entries of those signals are kept. Latency, status and size
+    of the request are recorded into metrics when given. api_url points
+    the request at another server, such as a local stand-in. timeout is
+    in seconds for the whole request.
+    """
+    url = f"{api_url}?path={CEZ_API_ENDPOINT}"
+    payload = {"ean": ean}
+    started = time.perf_counter()
+    status: int | str | None = None
+    size: int | None = None
+
+    try:
+        async with session.post(
+            url,
+            headers=CEZ_HEADERS,
+            data=json.dumps(payload),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            status = response.status
+            if response.status != 200:
+                raise CezHdoApiError(f"API request failed with status {response.status}")
+            if signals is None:
+                body = await response.read()
+                size = len(body)
+                return json.loads(body)
+
+            stream = SignalStreamFilter(signals)
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                stream.feed(chunk)
+            size = stream.bytes_received
+            return stream.result()
+    except Exception as err:
+        if status is None or status == 200:
+            status = type(err).__name__
+        raise
+    finally:
+        if metrics is not None:
+            metrics.record(time.perf_counter() - started, status, size)
+
+
 class CezHdoApi:
     """CEZ HDO API client."""
 
-    def __init__(self, ean: str, signal: str = "a3b4dp01") -> None:
-        """Initialize the API client."""
+    def __init__(
+        self,
+        ean: str,
+        signal: str = "a3b4dp01",
+        hub: CezHdoHub | None = None,
+        session: aiohttp.ClientSession | None = None,
+        combine_signals: Collection[str] = (),
+        combine_mode: str = COMBINE_MODE_UNION,
+        api_url: str = CEZ_API_URL,
+        clock: Callable[[], datetime] = cez_now,
+    ) -> None:
+        """Initialize the API client.
+
+        With a hub, requests are shared with every other client of the same
+        EAN. Otherwise the given session is used, or a private one that is
+        closed by async_close.
+
+        With combine_signals, the same response also yields the union or
+        intersection of the low tariff periods of the signal and those.
+        clock returns the current time and can be replaced for simulations.
+        """
         self.ean = ean
         self.signal = signal
-        self._session: aiohttp.ClientSession | None = None
+        self.combine_signals = tuple(s for s in combine_signals if s != signal)
+        self.combine_mode = combine_mode
+        self._hub = hub
+        self._session = session
+        self._own_session = False
+        self._api_url = api_url
+        self._clock = clock
+        self._last_response: dict[str, Any] | None = None
+        # perf_counter() when the last response was handed over for processing
+        self.response_received: float | None = None
+        self.last_success: datetime | None = None
+        self.metrics = CezHdoMetrics()
+        self.fetch_metrics = FetchMetrics()
         self.next_switch = None
         self.cached = None
 
-    async def async_get_data(self) -> dict[str, Any]:
-        """Get HDO data from CEZ API."""
-        now = datetime.now()
-        if self.next_switch is None or self.cached is None or self.next_switch < now:
-            url = f"{CEZ_API_URL}?path={CEZ_API_ENDPOINT}"
-            payload = {"ean": self.ean}
-
-            if self._session is None:
-                self._session = aiohttp.ClientSession()
+    def covers(self, moment: datetime) -> bool:
+        """Return True if the cached schedule can answer for the given moment."""
+        return self.cached is not None and self.cached["schedule"].covers(moment)
+
+    def is_due(self, moment: datetime) -> bool:
+        """Return True if the cached schedule should be refreshed."""
+        return (
+            self.last_success is None
+            or moment - self.last_success >= timedelta(seconds=SCHEDULE_MAX_AGE)
+        )
+
+    @property
+    def signals(self) -> frozenset[str]:
+        """Return every signal read from the response."""
+        return frozenset((self.signal, *self.combine_signals))
+
+    def restore(
+        self,
+        schedule: HdoSchedule,
+        last_update: datetime | None,
+        fingerprint: str | None,
+        combined_schedule: HdoSchedule | None = None,
+    ) -> None:
+        """Seed the cache with a previously stored schedule."""
+        self.cached = {
+            "schedule": schedule,
+            "schedule_last_update": last_update,
+            "fingerprint": fingerprint,
+            "combined_schedule": combined_schedule,
+        }
 
+    async def async_get_data(self, force_refresh: bool = False) -> dict[str, Any]:
+        """Get HDO data from CEZ API.
+
+        The schedule is only fetched when the cached schedule no longer
+        covers the current time, or when a refresh is forced; switches in
+        between are resolved locally by the coordinator without another
+        request.
+        """
+        now = self._clock()
+        if not force_refresh and self.covers(now):
+            self.metrics.cache_hits += 1
+        else:
+            self.metrics.cache_misses += 1
             try:
-                async with self._session.post(
-                    url,
-                    headers=CEZ_HEADERS,
-                    data=json.dumps(payload),
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status != 200:
-                        _LOGGER.error("API request failed with status %d", response.status)
-                        return self._get_error_state("API request failed")
-
-                    data = await response.json()
-                    response = self._parse_response(data)
-                    self.next_switch = response.get('next_switch')
-                    self.cached = response
+                if self._hub is not None:
+                    data = await self._hub.async_get(self.ean, self.signals)
+                else:
+                    if self._session is None:
+                        self._session = aiohttp.ClientSession()
+                        self._own_session = True
+                    data = await async_fetch_signals(
+                        self._session, self.ean, self.signals, self.fetch_metrics, self._api_url
+                    )
+            except CezHdoRequestDeferred as err:
+                _LOGGER.debug("Request for %s deferred: %s", self.ean, err)
+                return self._get_error_state(str(err))
+            except CezHdoApiError as err:
+                _LOGGER.error("API request failed: %s", err)
+                return self._get_error_state("API request failed")
             except aiohttp.ClientError as err:
                 _LOGGER.error("Error fetching data from CEZ API: %s", err)
                 return self._get_error_state(f"Network error: {err}")
@@ -59,8 +284,52 @@ class CezHdoApi:
             except Exception as err:
                 _LOGGER.error("Unexpected error: %s", err)
                 return self._get_error_state(f"Unexpected error: {err}")
+
+            response = self.process_response(data)
+            if response.get("error_mode"):
+                return response
         return self.cached
 
+    def process_response(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Parse a raw API response and cache the result if it is valid.
+
+        Also used for responses fetched on behalf of another signal of the
+        same EAN and handed over by the hub. A response whose fingerprint
+        matches the cached schedule is not parsed again and returns the
+        cached data unchanged.
+        """
+        self.response_received = time.perf_counter()
+        if data is self._last_response and self.cached is not None:
+            return self.cached
+
+        try:
+            fingerprint = signal_fingerprint(
+                data["data"]["signals"], self.signal, self.combine_signals
+            )
+        except (KeyError, TypeError, AttributeError):
+            fingerprint = None
+        if (
+            fingerprint is not None
+            and self.cached is not None
+            and self.cached.get("fingerprint") == fingerprint
+            and self.covers(self._clock())
+        ):
+            _LOGGER.debug("Schedule for signal '%s' is unchanged", self.signal)
+            self.metrics.unchanged_responses += 1
+            self._last_response = data
+            self.last_success = self._clock()
+            return self.cached
+
+        started = time.perf_counter()
+        response = self._parse_response(data)
+        self.metrics.parse.record(time.perf_counter() - started)
+        if not response.get("error_mode"):
+            response["fingerprint"] = fingerprint
+            self._last_response = data
+            self.last_success = self._clock()
+            self.next_switch = response.get('next_switch')
+            self.cached = response
+        return response
 
     def _get_error_state(self, error_message: str) -> dict[str, Any]:
         """Return error state with low tariff for safety."""
@@ -69,128 +338,64 @@ class CezHdoApi:
             "is_low_tariff": True,  # Low tariff for safety
             "next_switch": None,
             "current_period": "low_tariff",
-            "today_switches": [],
             "error_mode": True,
             "error_message": error_message
         }
 
     def _parse_response(self, data: dict[str, Any]) -> dict[str, Any]:
-        """Parse the API response for real CEZ format."""
+        """Parse the API response for real CEZ format.
+
+        Every date present for the configured signal is merged into one
+        schedule, so a single fetch covers several days of switching.
+        """
         result = {
             "is_low_tariff": False,
             "next_switch": None,
             "current_period": "normal_tariff",
-            "today_switches": []
         }
 
         try:
-            now = datetime.now()
-            today = now.date()
-            today_str = today.strftime("%d.%m.%Y")
+            now = self._clock()
 
-            _LOGGER.debug("Parsing CEZ API response for signal '%s', today: %s", self.signal, today_str)
+            _LOGGER.debug("Parsing CEZ API response for signal '%s'", self.signal)
 
             # Real CEZ API format: data.signals[] with signal, den, datum, casy
             signals_data = data.get("data", {}).get("signals", [])
             if not signals_data:
                 _LOGGER.warning("No 'signals' data found in API response")
-                return result
+                return self._get_error_state("No 'signals' data in API response")
 
             _LOGGER.debug("Found %d signal entries", len(signals_data))
 
-            # Find today's data for our signal
-            today_signal_data = None
-            for signal_entry in signals_data:
-                if (signal_entry.get("signal") == self.signal and
-                    signal_entry.get("datum") == today_str):
-                    today_signal_data = signal_entry
-                    _LOGGER.debug("Found today's data for signal '%s'", self.signal)
-                    break
-
-            if not today_signal_data:
+            schedule = parse_signals(signals_data, self.signal)
+            if schedule is None or not schedule.covers(now):
                 _LOGGER.warning("Today's data for signal '%s' not found", self.signal)
                 return self._get_error_state(f"Signal '{self.signal}' not found in API response")
 
-            # Parse time ranges from casy string
-            casy_string = today_signal_data.get("casy", "")
-            if not casy_string:
+            if not schedule:
                 _LOGGER.warning("No time ranges found for signal '%s'", self.signal)
                 return self._get_error_state(f"No schedule data for signal '{self.signal}'")
 
-            _LOGGER.debug("Raw casy string: '%s'", casy_string)
-
-            # Parse time ranges: "00:00-05:35; 06:30-08:55; ..."
-            today_switches = []
-
-            # Split by semicolon and clean up
-            time_ranges = [r.strip() for r in casy_string.split(';') if r.strip()]
-
-            for time_range in time_ranges:
-                if '-' not in time_range:
-                    continue
-
-                try:
-                    start_time_str, end_time_str = time_range.split('-', 1)
-                    start_time_str = start_time_str.strip()
-                    end_time_str = end_time_str.strip()
-
-                    # Parse start time
-                    start_hour, start_min = map(int, start_time_str.split(':'))
-                    start_datetime = datetime.combine(today, time(start_hour, start_min))
-
-                    # Parse end time - handle 24:00 as next day 00:00
-                    if end_time_str == "24:00":
-                        end_datetime = datetime.combine(today + timedelta(days=1), time(0, 0))
-                    else:
-                        end_hour, end_min = map(int, end_time_str.split(':'))
-                        if end_hour == 24:
-                            end_datetime = datetime.combine(today + timedelta(days=1), time(0, 0))
-                        else:
-                            end_datetime = datetime.combine(today, time(end_hour, end_min))
-
-                    # Add switches: ON at start, OFF at end
-                    today_switches.append({
-                        "time": start_datetime,
-                        "state": True  # LOW TARIFF ON
-                    })
-                    today_switches.append({
-                        "time": end_datetime,
-                        "state": False  # LOW TARIFF OFF
-                    })
-
-                    _LOGGER.debug("Time range %s-%s: ON at %s, OFF at %s",
-                                start_time_str, end_time_str,
-                                start_datetime.strftime('%H:%M'),
-                                end_datetime.strftime('%H:%M'))
-
-                except (ValueError, TypeError) as err:
-                    _LOGGER.warning("Could not parse time range '%s': %s", time_range, err)
-                    continue
-
-            # Sort switches by time
-            today_switches.sort(key=lambda x: x["time"])
-            result["today_switches"] = today_switches
-
-            # Determine current state and next switch
-            current_state = False  # Default to normal tariff
-            next_switch = None
-
-            for switch in today_switches:
-                if switch["time"] <= now:
-                    current_state = switch["state"]
-                elif next_switch is None:
-                    next_switch = switch["time"]
-                    break
+            _LOGGER.debug("Schedule for signal '%s': %d intervals from %s until %s",
+                         self.signal, len(schedule),
+                         from_minute(schedule.valid_from), from_minute(schedule.valid_until))
+
+            current_state = schedule.state_at(now)
+            next_switch = schedule.next_transition(now)
 
+            result["schedule"] = schedule
+            result["schedule_last_update"] = now
+            if self.combine_signals:
+                result["combined_schedule"] = self._combine(signals_data, schedule, now)
             result["is_low_tariff"] = current_state
             result["next_switch"] = next_switch
             result["current_period"] = "low_tariff" if current_state else "normal_tariff"
 
             _LOGGER.debug("Current state: %s, Next switch: %s",
                          "LOW TARIFF" if current_state else "NORMAL TARIFF",
-                         next_switch.strftime('%H:%M') if next_switch else "None")
+                         next_switch.strftime('%Y-%m-%d %H:%M') if next_switch else "None")
 
-        except (KeyError, ValueError, TypeError) as err:
+        except (KeyError, ValueError, TypeError, AttributeError) as err:
             _LOGGER.error("Error parsing API response: %s", err)
             _LOGGER.debug("Full API response: %s", data)
             return self._get_error_state(f"Failed to parse API response: {err}")
@@ -200,8 +405,28 @@ class CezHdoApi:
 
         return result
 
+    def _combine(
+        self, signals_data: list[dict[str, Any]], schedule: HdoSchedule, now: datetime
+    ) -> HdoSchedule | None:
+        """Merge the schedule with those of the combined signals.
+
+        Returns None if a combined signal has no schedule for now; the
+        configured signal keeps working on its own.
+        """
+        schedules = [schedule]
+        for signal in self.combine_signals:
+            other = parse_signals(signals_data, signal)
+            if other is None or not other.covers(now):
+                _LOGGER.warning("No schedule for combined signal '%s'", signal)
+                return None
+            schedules.append(other)
+        return HdoSchedule.combine(
+            schedules, intersection=self.combine_mode == COMBINE_MODE_INTERSECTION
+        )
+
     async def async_close(self) -> None:
-        """Close the session."""
-        if self._session:
+        """Close the session if it was created by this client."""
+        if self._session and self._own_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._own_session = False
@@ -0,0 +1,234 @@
+"""Compact archive of past CEZ HDO schedules.
+
+Once a day is over its schedule drops out of the cache, so the part of
+the schedule that has been in effect is appended to two files per EAN and
+signal: the low tariff intervals and the spans for which the schedule was
+known. Both hold sorted, non-overlapping pairs of native int64 epoch
+minutes after an 8 byte header, 16 bytes per interval, so a query maps the
+file and bisects it without reading the whole history into memory.
+
+Appending an interval that starts where the last one ends extends the last
+one, so hourly appends do not split the history into hourly records.
+Blocking methods must run in an executor.
+"""
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from pathlib import Path
+
+from .schedule import HdoSchedule
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"CEZHDOA1"
+BOUND_SIZE = array("q").itemsize
+RECORD_SIZE = 2 * BOUND_SIZE
+
+
+class ArchiveFormatError(Exception):
+    """Error to indicate a file that is not an interval file."""
+
+
+class IntervalFile:
+    """Append-only file of sorted, non-overlapping intervals in epoch minutes."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize; the file is created on the first append."""
+        self.path = path
+        self._checked = False
+
+    def check(self) -> None:
+        """Raise ArchiveFormatError if the file exists with a foreign header."""
+        try:
+            with open(self.path, "rb") as file:
+                header = file.read(len(MAGIC))
+        except FileNotFoundError:
+            return
+        # An empty file is left by a crash before the header was written
+        if header and header != MAGIC:
+            raise ArchiveFormatError(f"{self.path} is not a CEZ HDO archive file")
+        self._checked = True
+
+    def rotate(self) -> None:
+        """Move the file aside, so that the next append starts a new one."""
+        try:
+            self.path.replace(self.path.with_name(f"{self.path.name}.corrupt"))
+        except FileNotFoundError:
+            pass
+        self._checked = False
+
+    def _size(self) -> int:
+        """Return the size of the complete records in bytes."""
+        try:
+            size = self.path.stat().st_size - len(MAGIC)
+        except FileNotFoundError:
+            return 0
+        if not self._checked:
+            self.check()
+        return max(size, 0) // RECORD_SIZE * RECORD_SIZE
+
+    def last_end(self) -> int | None:
+        """Return the end of the last interval, None if there is none."""
+        size = self._size()
+        if not size:
+            return None
+        with open(self.path, "rb") as file:
+            file.seek(len(MAGIC) + size - RECORD_SIZE)
+            record = array("q")
+            record.frombytes(file.read(RECORD_SIZE))
+        return record[1]
+
+    def append(self, bounds: Sequence[int]) -> None:
+        """Append flat boundaries starting at or after the last end.
+
+        An interval starting at the last end extends the last interval.
+        """
+        if not bounds:
+            return
+        size = self._size()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "r+b" if size else "wb") as file:
+            if not size:
+                file.write(MAGIC)
+            else:
+                # Drop a record torn by a crash during an earlier write
+                file.truncate(len(MAGIC) + size)
+                file.seek(len(MAGIC) + size - BOUND_SIZE)
+                last_end = array("q")
+                last_end.frombytes(file.read(BOUND_SIZE))
+                if last_end[0] == bounds[0]:
+                    file.seek(len(MAGIC) + size - BOUND_SIZE)
+                    file.write(array("q", bounds[1:2]).tobytes())
+                    bounds = bounds[2:]
+            file.write(array("q", bounds).tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+
+    def truncate_after(self, minute: int) -> None:
+        """Drop the intervals after minute, left behind by a crash.
+
+        An interval across minute, extended by the interrupted append, is
+        cut back to end at minute.
+        """
+        size = self._size()
+        if not size:
+            return
+        with open(self.path, "r+b") as file, mmap.mmap(
+            file.fileno(), len(MAGIC) + size, access=mmap.ACCESS_READ
+        ) as mapped:
+            view = memoryview(mapped)[len(MAGIC):].cast("q")
+            try:
+                # Only the records of the interrupted append are affected
+                keep = len(view) // 2
+                while keep and view[2 * keep - 2] >= minute:
+                    keep -= 1
+                cut = bool(keep) and view[2 * keep - 1] > minute
+            finally:
+                view.release()
+        if keep * RECORD_SIZE < size or cut:
+            _LOGGER.debug("Dropping %d unfinished records from %s",
+                          size // RECORD_SIZE - keep, self.path)
+            with open(self.path, "r+b") as file:
+                file.truncate(len(MAGIC) + keep * RECORD_SIZE)
+                if cut:
+                    file.seek(len(MAGIC) + keep * RECORD_SIZE - BOUND_SIZE)
+                    file.write(array("q", (minute,)).tobytes())
+
+    def query(self, start: int, end: int) -> array:
+        """Return the boundaries clipped to [start, end), adjacent ones merged."""
+        clipped = array("q")
+        size = self._size()
+        if not size or start >= end:
+            return clipped
+        with open(self.path, "rb") as file, mmap.mmap(
+            file.fileno(), len(MAGIC) + size, access=mmap.ACCESS_READ
+        ) as mapped:
+            view = memoryview(mapped)[len(MAGIC):].cast("q")
+            try:
+                index = bisect_right(view, start)
+                index -= index % 2
+                for i in range(index, len(view), 2):
+                    if view[i] >= end:
+                        break
+                    if view[i + 1] <= start:
+                        continue
+                    low, high = max(view[i], start), min(view[i + 1], end)
+                    if clipped and clipped[-1] == low:
+                        clipped[-1] = high
+                    else:
+                        clipped.extend((low, high))
+            finally:
+                view.release()
+        return clipped
+
+
+class ScheduleArchive:
+    """Archive of the schedules in effect for one EAN and signal."""
+
+    def __init__(self, directory: Path, ean: str, signal: str) -> None:
+        """Initialize; no file is touched until the archive is used."""
+        self._low = IntervalFile(directory / f"{ean}_{signal}.low")
+        self._covered = IntervalFile(directory / f"{ean}_{signal}.covered")
+        self._lock = threading.Lock()
+        self._until: int | None = None
+        self._loaded = False
+
+    def _load(self) -> None:
+        """Read the end of the archive, repairing an interrupted append."""
+        if self._loaded:
+            return
+        try:
+            self._low.check()
+            self._covered.check()
+        except ArchiveFormatError as err:
+            # Both files go, low intervals without their spans are useless
+            _LOGGER.warning("Starting a new schedule archive: %s", err)
+            self._low.rotate()
+            self._covered.rotate()
+        self._until = self._covered.last_end()
+        # Low intervals are written before their span, so a crash in
+        # between can leave low intervals beyond the covered end
+        self._low.truncate_after(self._until if self._until is not None else -1)
+        self._loaded = True
+
+    @property
+    def archived_until(self) -> int | None:
+        """Return the end of the archived history in epoch minutes."""
+        with self._lock:
+            self._load()
+            return self._until
+
+    def append(self, schedule: HdoSchedule, until: int) -> bool:
+        """Archive the part of schedule before until not archived yet.
+
+        Returns True if anything was written.
+        """
+        with self._lock:
+            self._load()
+            start = schedule.valid_from
+            if self._until is not None:
+                start = max(start, self._until)
+            end = min(schedule.valid_until, until)
+            if start >= end:
+                return False
+            self._low.append(schedule.clip(start, end))
+            self._covered.append((start, end))
+            self._until = end
+        _LOGGER.debug("Archived schedule until %d to %s", end, self._covered.path)
+        return True
+
+    def query(self, start: int, end: int) -> tuple[array, array]:
+        """Return the low tariff and the known spans within [start, end).
+
+        Both are flat boundaries in epoch minutes; time outside the known
+        spans is neither low nor normal tariff.
+        """
+        with self._lock:
+            self._load()
+            return self._low.query(start, end), self._covered.query(start, end)
@@ -2,9 +2,8 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from datetime import date
 from typing import Any
-from datetime import datetime
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -17,6 +16,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import CONF_EAN, DOMAIN
 from .coordinator import CezHdoCoordinator
+from .schedule import CEZ_TZ, HdoSchedule
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +35,10 @@ async def async_setup_entry(
         CezHdoErrorSensor(coordinator, config_entry)
     ])
 
+    # Union or intersection over several signals, when configured
+    if coordinator.combine_signals:
+        async_add_entities([CezHdoCombinedSensor(coordinator, config_entry)])
+
 
 class CezHdoBinarySensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntity):
     """Representation of a CEZ HDO binary sensor."""
@@ -49,9 +53,11 @@ class CezHdoBinarySensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntit
         """Initialize the binary sensor."""
         super().__init__(coordinator)
 
-        self._attr_unique_id = f"cez_hdo_{coordinator.ean}"
-        self._attr_name = f"CEZ HDO {coordinator.ean}"
+        self._attr_unique_id = f"cez_hdo_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO {coordinator.ean} {coordinator.signal}"
         self._ean = coordinator.ean
+        self._attrs_key: tuple[Any, ...] | None = None
+        self._attrs: dict[str, Any] = {}
 
         # Device info
         self._attr_device_info = {
@@ -80,40 +86,66 @@ class CezHdoBinarySensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntit
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        if self.coordinator.data is None:
+        """Return the state attributes.
+
+        Attributes are rebuilt only when one of their inputs changes, so
+        the recorder does not see a new attribute set on every update.
+        """
+        data = self.coordinator.data
+        if data is None:
             return {}
 
+        today = self.coordinator.clock.now().astimezone(CEZ_TZ).date()
+        key = (
+            data.get("schedule"),
+            today,
+            data.get("current_period"),
+            data.get("next_switch"),
+            data.get("error_mode"),
+            data.get("error_message"),
+            data.get("schedule_last_update"),
+            data.get("stale_since"),
+        )
+        if key != self._attrs_key:
+            self._attrs = self._build_attributes(data, today)
+            self._attrs_key = key
+        return self._attrs
+
+    def _build_attributes(self, data: dict[str, Any], today: date) -> dict[str, Any]:
+        """Build the state attributes from coordinator data."""
         attrs = {
             "ean": self._ean,
             "signal": self.coordinator.signal,
-            "current_period": self.coordinator.data.get("current_period"),
-            "next_switch": self.coordinator.data.get("next_switch"),
+            "current_period": data.get("current_period"),
+            "next_switch": data.get("next_switch"),
         }
 
         # Check for error mode
-        if self.coordinator.data.get("error_mode"):
+        if data.get("error_mode"):
             attrs["error_mode"] = True
-            attrs["error_message"] = self.coordinator.data.get("error_message", "Unknown error")
+            attrs["error_message"] = data.get("error_message", "Unknown error")
             attrs["safety_mode"] = "low_tariff_activated"
         else:
             attrs["error_mode"] = False
 
         # Add schedule update information
-        schedule_update = self.coordinator.data.get("schedule_last_update")
+        schedule_update = data.get("schedule_last_update")
         if schedule_update:
             attrs["schedule_last_update"] = schedule_update.strftime("%Y-%m-%d %H:%M:%S")
-            # Calculate age in minutes
-            now = datetime.now()
-            attrs["schedule_age_minutes"] = int((now - schedule_update).total_seconds() / 60)
 
-        # Add today's switches
-        switches = self.coordinator.data.get("today_switches", [])
+        # Served from cache because refreshing the schedule failed
+        attrs["schedule_stale"] = bool(data.get("stale"))
+        if stale_since := data.get("stale_since"):
+            attrs["stale_since"] = stale_since.strftime("%Y-%m-%d %H:%M:%S")
+
+        # Add today's switches, converted from the schedule for back-compat
+        schedule: HdoSchedule | None = data.get("schedule")
+        switches = schedule.switches_on(today) if schedule else []
         if switches:
             attrs["today_switches_count"] = len(switches)
             attrs["switches_today"] = [
                 {
-                    "time": switch["time"].strftime("%H:%M") if hasattr(switch["time"], "strftime") else str(switch["time"]),
+                    "time": switch["time"].strftime("%H:%M"),
                     "state": "low_tariff" if switch["state"] else "normal_tariff"
                 }
                 for switch in switches
@@ -150,8 +182,8 @@ class CezHdoErrorSensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntity
         """Initialize the error sensor."""
         super().__init__(coordinator)
 
-        self._attr_unique_id = f"cez_hdo_error_{coordinator.ean}"
-        self._attr_name = f"CEZ HDO Error {coordinator.ean}"
+        self._attr_unique_id = f"cez_hdo_error_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO Error {coordinator.ean} {coordinator.signal}"
         self._ean = coordinator.ean
 
         # Device info - same device as main sensor
@@ -186,7 +218,17 @@ class CezHdoErrorSensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntity
         if self.coordinator.data.get("error_mode"):
             attrs["error_message"] = self.coordinator.data.get("error_message", "Unknown error")
             attrs["safety_mode"] = "low_tariff_activated"
-            attrs["last_error_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # When the error started, so the value stays stable while it lasts
+            error_since = self.coordinator.data.get("error_since")
+            if error_since:
+                attrs["last_error_time"] = error_since.strftime("%Y-%m-%d %H:%M:%S")
+        elif self.coordinator.data.get("stale"):
+            # Refresh failing, but the cached schedule still covers now
+            attrs["schedule_stale"] = True
+            attrs["last_fetch_error"] = self.coordinator.data.get("last_error")
+            stale_since = self.coordinator.data.get("stale_since")
+            if stale_since:
+                attrs["stale_since"] = stale_since.strftime("%Y-%m-%d %H:%M:%S")
 
         return attrs
 
@@ -195,3 +237,71 @@ class CezHdoErrorSensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntity
         """Return if entity is available."""
         # Error sensor is always available to report errors
         return True
+
+
+class CezHdoCombinedSensor(CoordinatorEntity[CezHdoCoordinator], BinarySensorEntity):
+    """Representation of low tariff combined over several CEZ HDO signals.
+
+    On while any of the signals is low (union) or while all of them are
+    (intersection), computed from the same response as the main sensor.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.POWER
+
+    def __init__(
+        self,
+        coordinator: CezHdoCoordinator,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the combined sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"cez_hdo_combined_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO Combined {coordinator.ean} {coordinator.signal}"
+        self._ean = coordinator.ean
+
+        # Device info - same device as main sensor
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.ean)},
+            "name": f"CEZ HDO {coordinator.ean}",
+            "manufacturer": "ČEZ Distribuce",
+            "model": "HDO Signal",
+            "entry_type": "service",
+            "suggested_area": "Utility",
+        }
+
+    @property
+    def icon(self) -> str:
+        """Return the icon to use in the frontend."""
+        return "mdi:flash" if self.is_on else "mdi:flash-outline"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return true if the combined low tariff is active."""
+        data = self.coordinator.data
+        if data is None:
+            return None
+        if data.get("error_mode"):
+            # Low tariff for safety, like the main sensor
+            return True
+        return data.get("combined_is_low_tariff")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        data = self.coordinator.data or {}
+        return {
+            "ean": self._ean,
+            "signals": [self.coordinator.signal, *self.coordinator.combine_signals],
+            "mode": self.coordinator.combine_mode,
+            "next_switch": data.get("combined_next_switch"),
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        data = self.coordinator.data
+        # A combined signal missing from the response leaves no state
+        return data is not None and (
+            bool(data.get("error_mode")) or data.get("combined_is_low_tariff") is not None
+        )
@@ -0,0 +1,108 @@
+"""Calendar platform for CEZ HDO integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import CezHdoCoordinator
+from .schedule import HdoSchedule, from_minute, to_minute
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up CEZ HDO calendar based on a config entry."""
+    coordinator: CezHdoCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([CezHdoCalendar(coordinator)])
+
+
+class CezHdoCalendar(CoordinatorEntity[CezHdoCoordinator], CalendarEntity):
+    """Calendar of CEZ HDO low tariff periods.
+
+    Events are read straight from the bisect-indexed schedule, so a range
+    query costs two bisects plus one event per period in the range.
+    """
+
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(self, coordinator: CezHdoCoordinator) -> None:
+        """Initialize the calendar."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"cez_hdo_calendar_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO Calendar {coordinator.ean} {coordinator.signal}"
+
+        # Device info - same device as the binary sensors
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.ean)},
+            "name": f"CEZ HDO {coordinator.ean}",
+            "manufacturer": "ČEZ Distribuce",
+            "model": "HDO Signal",
+            "entry_type": "service",
+            "suggested_area": "Utility",
+        }
+
+    @property
+    def _schedule(self) -> HdoSchedule | None:
+        """Return the schedule unless the coordinator is in error mode."""
+        data = self.coordinator.data
+        if data is None or data.get("error_mode"):
+            return None
+        return data.get("schedule")
+
+    def _event(self, start: int, end: int) -> CalendarEvent:
+        """Build an event for one low tariff interval in epoch minutes."""
+        return CalendarEvent(
+            start=from_minute(start, dt_util.DEFAULT_TIME_ZONE),
+            end=from_minute(end, dt_util.DEFAULT_TIME_ZONE),
+            summary="Low tariff",
+            description=f"HDO signal {self.coordinator.signal}",
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next low tariff period."""
+        schedule = self._schedule
+        if schedule is None:
+            return None
+
+        moment = self.coordinator.clock.now()
+        now = to_minute(moment)
+        # The period containing now, otherwise the first one after it
+        periods = schedule.overlapping(now, now + 1)
+        if not periods:
+            next_start = schedule.next_transition(moment)
+            if next_start is None:
+                return None
+            start = to_minute(next_start)
+            periods = schedule.overlapping(start, start + 1)
+        return self._event(*periods[0]) if periods else None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the low tariff periods overlapping a date range."""
+        schedule = self._schedule
+        if schedule is None:
+            return []
+        return [
+            self._event(start, end)
+            for start, end in schedule.overlapping(to_minute(start_date), to_minute(end_date))
+        ]
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return True
@@ -2,44 +2,80 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import CONF_EAN, CONF_SIGNAL, DEFAULT_SIGNAL, AVAILABLE_SIGNALS, DOMAIN
-from .api import CezHdoApi
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
+
+from .const import (
+    AVAILABLE_SIGNALS,
+    COMBINE_MODE_INTERSECTION,
+    COMBINE_MODE_UNION,
+    CONF_AVAILABLE_SIGNALS,
+    CONF_COMBINE_MODE,
+    CONF_COMBINE_SIGNALS,
+    CONF_EAN,
+    CONF_ENERGY_STATISTIC,
+    CONF_PUSH_ENDPOINT,
+    CONF_SIGNAL,
+    DEFAULT_SIGNAL,
+    DISCOVERY_RESPONSE_TTL,
+    DOMAIN,
+)
+from .coordinator import async_get_hub, entry_unique_id
 
 _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_EAN): str,
-        vol.Optional(CONF_SIGNAL, default=DEFAULT_SIGNAL): vol.In(AVAILABLE_SIGNALS),
     }
 )
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    api = CezHdoApi(data[CONF_EAN], data.get(CONF_SIGNAL, DEFAULT_SIGNAL))
+    """Validate the user input allows us to connect.
 
+    The complete response is fetched once, past the cache of the shared
+    hub, and returned together with the signals it lists for the EAN.
+    """
     try:
-        await api.async_get_data()
+        response = await async_get_hub(hass).async_discover(data[CONF_EAN])
     except Exception as exc:
         _LOGGER.error("Cannot connect to CEZ API: %s", exc)
         raise CannotConnect from exc
 
-    return {"title": f"CEZ HDO ({data[CONF_EAN]})"}
+    try:
+        signals = sorted(
+            {entry["signal"] for entry in response["data"]["signals"] if entry.get("signal")}
+        )
+    except (KeyError, TypeError) as exc:
+        raise CannotConnect from exc
+    if not signals:
+        raise InvalidEan
+
+    return {
+        "signals": signals,
+        "response": response,
+    }
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for CEZ HDO."""
 
-    VERSION = 1
+    VERSION = 2
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._ean: str | None = None
+        self._info: dict[str, Any] = {}
+        self._fetched_at = 0.0
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -58,14 +94,96 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                await self.async_set_unique_id(user_input[CONF_EAN])
-                self._abort_if_unique_id_configured()
-                return self.async_create_entry(title=info["title"], data=user_input)
+                self._ean = user_input[CONF_EAN]
+                self._info = info
+                self._fetched_at = time.monotonic()
+                return await self.async_step_signal()
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_signal(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Select one of the signals found for the EAN."""
+        signals: list[str] = self._info["signals"]
+
+        if user_input is not None:
+            signal = user_input[CONF_SIGNAL]
+            # One entry per signal, several signals of one EAN share its requests
+            await self.async_set_unique_id(entry_unique_id(self._ean, signal))
+            self._abort_if_unique_id_configured()
+            # The new entry starts from the response fetched above
+            async_get_hub(self.hass).prime(
+                self._ean, self._info["response"], self._fetched_at + DISCOVERY_RESPONSE_TTL
+            )
+            return self.async_create_entry(
+                title=f"CEZ HDO ({self._ean} {signal})",
+                data={
+                    CONF_EAN: self._ean,
+                    CONF_SIGNAL: signal,
+                    CONF_AVAILABLE_SIGNALS: signals,
+                },
+            )
+
+        default = DEFAULT_SIGNAL if DEFAULT_SIGNAL in signals else signals[0]
+        return self.async_show_form(
+            step_id="signal",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_SIGNAL, default=default): vol.In(signals)}
+            ),
+            description_placeholders={"signals": ", ".join(signals)},
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle CEZ HDO options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Select combined signals, the energy sensor and the timeline endpoint."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        signal = self._entry.data.get(CONF_SIGNAL, DEFAULT_SIGNAL)
+        available = self._entry.data.get(CONF_AVAILABLE_SIGNALS, AVAILABLE_SIGNALS)
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_COMBINE_SIGNALS,
+                    default=list(options.get(CONF_COMBINE_SIGNALS, [])),
+                ): cv.multi_select([s for s in available if s != signal]),
+                vol.Optional(
+                    CONF_COMBINE_MODE,
+                    default=options.get(CONF_COMBINE_MODE, COMBINE_MODE_UNION),
+                ): vol.In([COMBINE_MODE_UNION, COMBINE_MODE_INTERSECTION]),
+                vol.Optional(
+                    CONF_ENERGY_STATISTIC,
+                    description={"suggested_value": options.get(CONF_ENERGY_STATISTIC)},
+                ): EntitySelector(EntitySelectorConfig(domain="sensor", device_class="energy")),
+                vol.Optional(
+                    CONF_PUSH_ENDPOINT,
+                    default=options.get(CONF_PUSH_ENDPOINT, False),
+                ): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
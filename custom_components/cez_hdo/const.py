@@ -5,18 +5,86 @@ DOMAIN = "cez_hdo"
 # Configuration
 CONF_EAN = "ean"
 CONF_SIGNAL = "signal"
+CONF_COMBINE_SIGNALS = "combine_signals"
+CONF_COMBINE_MODE = "combine_mode"
+CONF_AVAILABLE_SIGNALS = "available_signals"  # signals found for the EAN at setup
+CONF_ENERGY_STATISTIC = "energy_statistic"  # energy sensor split into low and normal tariff
+CONF_PUSH_ENDPOINT = "push_endpoint"  # serve the timeline to field devices
+
+# Combined entity over several signals of one EAN
+COMBINE_MODE_UNION = "union"
+COMBINE_MODE_INTERSECTION = "intersection"
 
 # Default values
 DEFAULT_NAME = "CEZ HDO"
-DEFAULT_SCAN_INTERVAL = 30  # 30 second
+DEFAULT_SCAN_INTERVAL = 3600  # 1 hour, safety net only - switches are timer driven
+DEFAULT_RETRY_INTERVAL = 60  # 1 minute, used while the API is failing
+SCHEDULE_MAX_AGE = 6 * 3600  # refresh a cached schedule in the background after 6 hours
+
+# Day-ahead prefetch, at a random local time so installations spread out
+PREFETCH_WINDOW_START = 12  # hour
+PREFETCH_WINDOW_END = 18  # hour
+PREFETCH_DEADLINE = 23  # hour, no retries for tomorrow's schedule after this
+PREFETCH_RETRY_INTERVAL = 1800  # seconds, jittered, while tomorrow is not published
 DEFAULT_SIGNAL = "a3b4dp01"
 
-# Available signals
+# Fired when CEZ changes an already published schedule
+EVENT_SCHEDULE_CHANGED = f"{DOMAIN}_schedule_changed"
+
+# Persistent schedule cache
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds
+ARCHIVE_DIR = f"{DOMAIN}_archive"  # past schedules, under .storage
+
+# Shared fetch hub
+DATA_HUB = f"{DOMAIN}_hub"
+HUB_RESPONSE_TTL = 60  # seconds a fetched response is shared without refetching
+DISCOVERY_RESPONSE_TTL = 600  # seconds the config flow's response serves the new entry
+
+# Upstream protection, per EAN backoff and a request budget shared by all entries
+BACKOFF_BASE_DELAY = 60  # seconds after the first failure, doubled per failure
+BACKOFF_MAX_DELAY = 3600  # seconds
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+REQUEST_BUDGET_CAPACITY = 50  # requests allowed in a burst
+REQUEST_BUDGET_REFILL = 10  # seconds per additional request
+
+# Local timeline endpoint for field devices
+DATA_PUSH_VIEW = f"{DOMAIN}_push_view"
+PUSH_MAX_WAIT = 300  # seconds a long-poll may wait for a new schedule version
+
+# Fleet mode, bulk fetching of many EANs outside Home Assistant
+FLEET_CONCURRENCY = 10  # EANs fetched at the same time
+FLEET_RETRIES = 3  # further attempts per EAN after a failed one
+FLEET_RETRY_DELAY = 2  # seconds before the first retry, doubled per failure
+FLEET_MAX_RETRY_DELAY = 60  # seconds
+FLEET_TIMEOUT = 30  # seconds per request
+
+# Services
+SERVICE_FIND_WINDOW = "find_window"
+ATTR_DURATION = "duration"
+ATTR_HORIZON = "horizon"
+ATTR_FINISH_BY = "finish_by"
+ATTR_MODE = "mode"
+WINDOW_MODE_EARLIEST = "earliest"
+WINDOW_MODE_LONGEST = "longest"
+WINDOW_MODE_ALL = "all"
+SERVICE_SPLIT_ENERGY = "split_energy"
+ATTR_STATISTIC_ID = "statistic_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_PERIOD = "period"
+ATTR_RESOLUTION = "resolution"
+SERVICE_LOW_INTERVALS = "low_intervals"
+
+# Known signals, offered to entries set up before signal discovery
 AVAILABLE_SIGNALS = ["a3b4dp01", "a3b4dp02", "a3b4dp06"]
 
 # API
 CEZ_API_URL = "https://dip.cezdistribuce.cz/irj/portal/anonymous/casy-spinani"
 CEZ_API_ENDPOINT = "switch-times/signals"
+CEZ_TIMEZONE = "Europe/Prague"
+REQUEST_TIMEOUT = 30  # seconds per request to CEZ
+STREAM_CHUNK_SIZE = 4096  # bytes read at a time when streaming a response
 
 # Headers for the API request
 CEZ_HEADERS = {
@@ -2,39 +2,388 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+import random
+from array import array
+from collections.abc import Callable, Coroutine
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_point_in_time, async_track_time_change
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import CezHdoApi
-from .const import CONF_EAN, CONF_SIGNAL, DEFAULT_SIGNAL, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .archive import ScheduleArchive
+from .const import (
+    ARCHIVE_DIR,
+    COMBINE_MODE_UNION,
+    CONF_COMBINE_MODE,
+    CONF_COMBINE_SIGNALS,
+    CONF_EAN,
+    CONF_ENERGY_STATISTIC,
+    CONF_PUSH_ENDPOINT,
+    CONF_SIGNAL,
+    DATA_HUB,
+    DEFAULT_RETRY_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SIGNAL,
+    DOMAIN,
+    EVENT_SCHEDULE_CHANGED,
+    PREFETCH_DEADLINE,
+    PREFETCH_RETRY_INTERVAL,
+    PREFETCH_WINDOW_END,
+    PREFETCH_WINDOW_START,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .energy import period_starts, split_energy, totals_by_period
+from .hub import CezHdoHub
+from .schedule import CEZ_TZ, HdoSchedule, from_minute, to_minute
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class HassClock:
+    """Wall clock time and Home Assistant timers used by the coordinator.
+
+    A simulation replaces it with virtual time, so that days of switching
+    can be replayed through the coordinator in seconds.
+    """
+
+    def now(self) -> datetime:
+        """Return the current time."""
+        return dt_util.now()
+
+    @callback
+    def async_track_point_in_time(
+        self, hass: HomeAssistant, action: Callable[[datetime], Any], point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Call action once at point_in_time, returning a cancel function."""
+        return async_track_point_in_time(hass, action, point_in_time)
+
+    @callback
+    def async_track_time_change(
+        self,
+        hass: HomeAssistant,
+        action: Callable[[datetime], Any],
+        minute: int | None = None,
+        second: int = 0,
+    ) -> CALLBACK_TYPE:
+        """Call action every minute at second, or every hour at minute and second.
+
+        Returns a cancel function.
+        """
+        return async_track_time_change(hass, action, minute=minute, second=second)
+
+
+def entry_unique_id(ean: str, signal: str) -> str:
+    """Return the unique ID of the config entry of one signal of an EAN."""
+    return f"{ean}_{signal}"
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> CezHdoHub:
+    """Return the fetch hub shared by all config entries."""
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = CezHdoHub(async_get_clientsession(hass))
+    return hub
+
+
 class CezHdoCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Class to manage fetching CEZ HDO data."""
+    """Class to manage fetching CEZ HDO data.
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
+    Polling is only a slow safety net. Tariff switches are driven by a
+    one-shot timer armed at the next switch of the cached schedule, and the
+    new state is computed locally without touching the network.
+
+    While the cached schedule covers the current time it is always served
+    (stale-while-revalidate): refreshes run in the background and a failed
+    one only marks the data as stale. The safety low tariff state is used
+    once the cache no longer covers the current time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        clock: HassClock | None = None,
+        request_refresh_debouncer: Debouncer | None = None,
+    ) -> None:
         """Initialize the coordinator."""
-        self.api = CezHdoApi(config[CONF_EAN], config.get(CONF_SIGNAL, DEFAULT_SIGNAL))
+        self.clock = clock or HassClock()
+        self.hub = async_get_hub(hass)
+        self.api = CezHdoApi(
+            config[CONF_EAN],
+            config.get(CONF_SIGNAL, DEFAULT_SIGNAL),
+            self.hub,
+            combine_signals=config.get(CONF_COMBINE_SIGNALS, ()),
+            combine_mode=config.get(CONF_COMBINE_MODE, COMBINE_MODE_UNION),
+            clock=self.clock.now,
+        )
         self.ean = config[CONF_EAN]
         self.signal = config.get(CONF_SIGNAL, DEFAULT_SIGNAL)
+        self.combine_signals = self.api.combine_signals
+        self.combine_mode = self.api.combine_mode
+        self.energy_statistic: str | None = config.get(CONF_ENERGY_STATISTIC)
+        self.push_endpoint: bool = config.get(CONF_PUSH_ENDPOINT, False)
+        self.metrics = self.api.metrics
+        self._unsub_switch: CALLBACK_TYPE | None = None
+        self._unsub_prefetch: CALLBACK_TYPE | None = None
+        self._fetching = False
+        self._unsub_hub = self.hub.subscribe(
+            self.ean, self.api.signals, self._async_handle_response
+        )
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.ean}_{self.signal}"
+        )
+        self.archive = ScheduleArchive(
+            Path(hass.config.path(STORAGE_DIR, ARCHIVE_DIR)), self.ean, self.signal
+        )
+        self._stored_schedule: HdoSchedule | None = None
+        self._stored_combined: HdoSchedule | None = None
+        self._revalidating = False
+        self._stale_since: datetime | None = None
+        self._last_error: str | None = None
+        # Receipt of the response the next listener update is caused by
+        self._response_received: float | None = None
+        self._minute_listeners: list[CALLBACK_TYPE] = []
+        self._unsub_minute: CALLBACK_TYPE | None = None
+        self._timeline_key: tuple[Any, ...] | None = None
+        self._timeline_values: dict[str, Any] = {}
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            request_refresh_debouncer=request_refresh_debouncer,
+            # Unchanged data must not rewrite entity state
+            always_update=False,
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from API endpoint and compute current state."""
+        now = self.clock.now()
+        self._response_received = None
+        await self._async_archive(now)
+        if self.api.covers(now):
+            # Serve the cache right away, refresh it in the background if due
+            if self.api.is_due(now):
+                self.async_start_revalidate()
+            data = self._compute_current_state(self.api.cached, now)
+        else:
+            data = await self._async_fetch_state()
+
+        # Retry quickly while failing, otherwise fall back to the safety net
+        if data.get("error_mode"):
+            # ...but never before the hub's backoff allows another request
+            self.update_interval = timedelta(
+                seconds=max(DEFAULT_RETRY_INTERVAL, self.hub.retry_in(self.ean))
+            )
+            # Keep the start of an ongoing error, not the time of each retry
+            if self.data and self.data.get("error_mode"):
+                data["error_since"] = self.data.get("error_since")
+            else:
+                data["error_since"] = self.clock.now()
+        else:
+            self.update_interval = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+
+        self._async_schedule_switch(data)
+        return data
+
+    async def async_restore(self) -> bool:
+        """Restore the last good schedule from disk.
+
+        Returns True if the stored schedule covers the current time and the
+        coordinator data has been set from it, without any network call.
+        """
+        try:
+            stored = await self._store.async_load()
+            if not stored:
+                return False
+            schedule = HdoSchedule.from_dict(stored["schedule"])
+            last_update = dt_util.parse_datetime(stored.get("schedule_last_update") or "")
+            fingerprint = stored.get("fingerprint")
+            # Only valid for the signals it was combined from
+            combined = None
+            if self.combine_signals and stored.get("combined_key") == self._combined_key:
+                combined = HdoSchedule.from_dict(stored["combined_schedule"])
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring invalid stored schedule for %s: %s", self.ean, err)
+            return False
+
+        now = self.clock.now()
+        if not schedule.covers(now):
+            _LOGGER.debug("Stored schedule for %s is outdated", self.ean)
+            return False
+
+        _LOGGER.debug("Restored schedule for %s (%d intervals)", self.ean, len(schedule))
+        self._stored_schedule = schedule
+        self._stored_combined = combined
+        self.api.restore(schedule, last_update, fingerprint, combined)
+        data = self._compute_current_state(self.api.cached, now)
+        self.async_set_updated_data(data)
+        self._async_schedule_switch(data)
+        return True
+
+    @callback
+    def async_start_revalidate(self) -> None:
+        """Start a background refresh of the cached schedule."""
+        if self._revalidating:
+            return
+        self._revalidating = True
+        self._async_create_background_task(
+            self.async_revalidate(), f"{DOMAIN}_revalidate_{self.ean}_{self.signal}"
+        )
+
+    @callback
+    def _async_create_background_task(
+        self, target: Coroutine[Any, Any, None], name: str
+    ) -> None:
+        """Run target in the background, cancelled when the entry unloads.
+
+        Without an entry, in the simulator and in tests, the task belongs to
+        Home Assistant.
+        """
+        if self.config_entry is not None:
+            self.config_entry.async_create_background_task(self.hass, target, name)
+        else:
+            self.hass.async_create_background_task(target, name)
+
+    async def async_revalidate(self) -> None:
+        """Fetch a fresh schedule while the cached one keeps being served.
+
+        A failure keeps the cached schedule in place and marks it stale.
+        """
+        self._revalidating = True
+        self._fetching = True
+        try:
+            schedule_data = await self.api.async_get_data(force_refresh=True)
+        except Exception as err:  # pylint: disable=broad-except
+            schedule_data = self._get_error_state(f"Error communicating with API: {err}")
+        finally:
+            self._fetching = False
+            self._revalidating = False
+
+        if schedule_data.get("error_mode"):
+            _LOGGER.warning("Could not revalidate cached schedule for %s: %s",
+                            self.ean, schedule_data.get("error_message"))
+            self._last_error = schedule_data.get("error_message")
+            if self._stale_since is None:
+                self._stale_since = self.clock.now()
+                self._async_push_cached_state()
+            return
+
+        was_stale = self._stale_since is not None
+        self._stale_since = None
+        self._last_error = None
+        if self._async_handle_schedule(schedule_data) or was_stale:
+            self._async_push_cached_state(self.api.response_received)
+
+    @callback
+    def _async_push_cached_state(self, received: float | None = None) -> None:
+        """Recompute the state from the cache and hand it to the entities.
+
+        received is the perf_counter() of the response that caused the push.
+        """
+        now = self.clock.now()
+        if not self.api.covers(now):
+            return
+        self._response_received = received
+        data = self._compute_current_state(self.api.cached, now)
+        self.async_set_updated_data(data)
+        self._async_schedule_switch(data)
+
+    @callback
+    def _async_handle_response(self, data: dict[str, Any]) -> None:
+        """Take over a response fetched by another entry of the same EAN."""
+        if self._fetching:
+            # Our own request, handled when it returns
+            return
+
+        previous = self.api.cached
+        schedule_data = self.api.process_response(data)
+        if schedule_data.get("error_mode") or schedule_data is previous:
+            return
+
+        _LOGGER.debug("Received shared CEZ response for %s/%s", self.ean, self.signal)
+        was_stale = self._stale_since is not None
+        self._stale_since = None
+        self._last_error = None
+        if self._async_handle_schedule(schedule_data) or was_stale:
+            self._async_push_cached_state(self.api.response_received)
+
+    @callback
+    def _async_handle_schedule(self, schedule_data: dict[str, Any]) -> bool:
+        """Persist a newly received schedule and announce real changes.
+
+        Returns False if the schedule equals the stored one.
+        """
+        schedule: HdoSchedule = schedule_data["schedule"]
+        combined: HdoSchedule | None = schedule_data.get("combined_schedule")
+        previous = self._stored_schedule
+        if schedule == previous and combined == self._stored_combined:
+            return False
+        self._stored_schedule = schedule
+        self._stored_combined = combined
+
+        if previous is not None and schedule.differs_from(previous):
+            _LOGGER.info("CEZ changed the HDO schedule for %s/%s", self.ean, self.signal)
+            self.hass.bus.async_fire(
+                EVENT_SCHEDULE_CHANGED,
+                {
+                    "ean": self.ean,
+                    "signal": self.signal,
+                    "fingerprint": schedule_data.get("fingerprint"),
+                },
+            )
+
+        last_update: datetime | None = schedule_data.get("schedule_last_update")
+        fingerprint: str | None = schedule_data.get("fingerprint")
+
+        def _data_to_save() -> dict[str, Any]:
+            data = {
+                "schedule": schedule.as_dict(),
+                "schedule_last_update": last_update.isoformat() if last_update else None,
+                "fingerprint": fingerprint,
+            }
+            if combined is not None:
+                data["combined_schedule"] = combined.as_dict()
+                data["combined_key"] = self._combined_key
+            return data
+
+        self._store.async_delay_save(_data_to_save, STORAGE_SAVE_DELAY)
+        return True
+
+    async def _async_archive(self, now: datetime) -> None:
+        """Append the part of the schedule in effect until now to the archive."""
+        if (schedule := self._stored_schedule) is None:
+            return
+        try:
+            await self.hass.async_add_executor_job(
+                self.archive.append, schedule, to_minute(now)
+            )
+        except OSError as err:
+            _LOGGER.warning("Could not archive the schedule of %s: %s", self.ean, err)
+
+    async def _async_fetch_state(self) -> dict[str, Any]:
+        """Get the schedule from the API and compute the current state."""
         try:
             # Get schedule data from API
-            schedule_data = await self.api.async_get_data()
+            self._fetching = True
+            try:
+                schedule_data = await self.api.async_get_data()
+            finally:
+                self._fetching = False
             if not schedule_data:
                 _LOGGER.error("No data received from CEZ API - using error state")
                 return self._get_error_state("No data received from CEZ API")
@@ -45,17 +394,156 @@ class CezHdoCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                               schedule_data.get("error_message", "Unknown error"))
                 return schedule_data  # Return error state as-is
 
-            # Compute current state based on schedule
-            #now = datetime.now()
-            #current_data = self._compute_current_state(schedule_data, now)
+            self._stale_since = None
+            self._last_error = None
+            self._async_handle_schedule(schedule_data)
+            self._response_received = self.api.response_received
 
-            return schedule_data
+            # Compute current state based on schedule
+            return self._compute_current_state(schedule_data, self.clock.now())
 
         except Exception as err:
             _LOGGER.error("Error in coordinator update: %s", err)
             # Return error state instead of raising exception
             return self._get_error_state(f"Error communicating with API: {err}")
 
+    @callback
+    def _async_schedule_switch(self, data: dict[str, Any]) -> None:
+        """Arm a one-shot timer at the next tariff switch.
+
+        The timer is also armed at local midnight, so that today's switches
+        roll over, and at the end of the schedule, so that the next schedule
+        gets fetched.
+        """
+        self._async_cancel_switch()
+        if data.get("error_mode"):
+            return
+
+        today = self.clock.now().astimezone(CEZ_TZ).date()
+        candidates = [
+            datetime.combine(today + timedelta(days=1), time(0, 0), CEZ_TZ),
+            from_minute(data["schedule"].valid_until),
+        ]
+        if data.get("next_switch") is not None:
+            candidates.append(data["next_switch"])
+        if data.get("combined_next_switch") is not None:
+            candidates.append(data["combined_next_switch"])
+        switch_time = min(candidates)
+
+        _LOGGER.debug("Next tariff switch for %s at %s", self.ean, switch_time)
+
+        @callback
+        def _handle_switch(_now: datetime) -> None:
+            self._async_handle_switch(switch_time)
+
+        self._unsub_switch = self.clock.async_track_point_in_time(
+            self.hass, _handle_switch, switch_time
+        )
+
+    @callback
+    def _async_handle_switch(self, switch_time: datetime) -> None:
+        """Recompute the state locally at a switch instant."""
+        self._unsub_switch = None
+        self._response_received = None
+        self.metrics.switch_lag.record(max((self.clock.now() - switch_time).total_seconds(), 0))
+        # Never evaluate before the switch itself, timers may fire a bit early
+        now = max(self.clock.now(), switch_time)
+
+        if self.data is None or not self.api.covers(now):
+            # The cached schedule is over, fetch the next one
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        data = self._compute_current_state(self.data, now)
+        self.async_set_updated_data(data)
+        self._async_schedule_switch(data)
+
+    @callback
+    def async_schedule_prefetch(self, day: date | None = None) -> None:
+        """Arm the day-ahead prefetch at a random time of the afternoon.
+
+        Fetching tomorrow's schedule well before midnight lets the midnight
+        switch be computed from memory, and the random time keeps
+        installations from all hitting CEZ at once.
+        """
+        self._async_cancel_prefetch()
+        now = self.clock.now()
+        local_now = now.astimezone(CEZ_TZ)
+        day = day or local_now.date()
+        window_start = datetime.combine(day, time(PREFETCH_WINDOW_START, 0), CEZ_TZ)
+        window = (PREFETCH_WINDOW_END - PREFETCH_WINDOW_START) * 3600
+        prefetch_time = window_start + timedelta(seconds=random.uniform(0, window))
+        if prefetch_time <= now:
+            if day == local_now.date() and local_now.hour < PREFETCH_DEADLINE:
+                # Started late in the day, e.g. after a restart
+                prefetch_time = now + timedelta(
+                    seconds=random.uniform(0, PREFETCH_RETRY_INTERVAL)
+                )
+            else:
+                self.async_schedule_prefetch(day + timedelta(days=1))
+                return
+
+        _LOGGER.debug("Day-ahead prefetch for %s at %s", self.ean, prefetch_time)
+        self._unsub_prefetch = self.clock.async_track_point_in_time(
+            self.hass, self._async_handle_prefetch, prefetch_time
+        )
+
+    @callback
+    def _async_handle_prefetch(self, _now: datetime) -> None:
+        """Fetch tomorrow's schedule unless it is already cached."""
+        self._unsub_prefetch = None
+        if self._covers_tomorrow():
+            today = self.clock.now().astimezone(CEZ_TZ).date()
+            self.async_schedule_prefetch(today + timedelta(days=1))
+            return
+        self._async_create_background_task(
+            self._async_prefetch(), f"{DOMAIN}_prefetch_{self.ean}_{self.signal}"
+        )
+
+    async def _async_prefetch(self) -> None:
+        """Revalidate the schedule and retry until tomorrow is published."""
+        await self.async_revalidate()
+
+        now = self.clock.now()
+        today = now.astimezone(CEZ_TZ).date()
+        retry_time = now + timedelta(
+            seconds=PREFETCH_RETRY_INTERVAL * random.uniform(0.5, 1.5)
+        )
+        deadline = datetime.combine(today, time(PREFETCH_DEADLINE, 0), CEZ_TZ)
+        if self._covers_tomorrow() or retry_time >= deadline:
+            if not self._covers_tomorrow():
+                _LOGGER.info("Tomorrow's HDO schedule for %s is not published yet", self.ean)
+            self.async_schedule_prefetch(today + timedelta(days=1))
+            return
+
+        _LOGGER.debug("Tomorrow's schedule for %s not available, retrying at %s",
+                      self.ean, retry_time)
+        self._unsub_prefetch = self.clock.async_track_point_in_time(
+            self.hass, self._async_handle_prefetch, retry_time
+        )
+
+    def _covers_tomorrow(self) -> bool:
+        """Return True if the cached schedule runs until the end of tomorrow."""
+        if self.api.cached is None:
+            return False
+        day_after = self.clock.now().astimezone(CEZ_TZ).date() + timedelta(days=2)
+        end = datetime.combine(day_after, time(0, 0), CEZ_TZ)
+        return self.api.cached["schedule"].valid_until >= to_minute(end)
+
+    @callback
+    def _async_cancel_prefetch(self) -> None:
+        """Cancel the pending prefetch timer."""
+        if self._unsub_prefetch is not None:
+            self._unsub_prefetch()
+            self._unsub_prefetch = None
+
+    @callback
+    def _async_cancel_switch(self) -> None:
+        """Cancel the pending switch timer."""
+        if self._unsub_switch is not None:
+            self._unsub_switch()
+            self._unsub_switch = None
+
     def _get_error_state(self, error_message: str) -> dict[str, Any]:
         """Return error state with low tariff for safety."""
         _LOGGER.warning("Returning error state with low tariff: %s", error_message)
@@ -63,7 +551,6 @@ class CezHdoCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "is_low_tariff": True,  # Low tariff for safety
             "next_switch": None,
             "current_period": "low_tariff",
-            "today_switches": [],
             "error_mode": True,
             "error_message": error_message
         }
@@ -71,50 +558,227 @@ class CezHdoCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     def _compute_current_state(self, schedule_data: dict[str, Any], now: datetime) -> dict[str, Any]:
         """Compute current HDO state based on schedule data."""
         # Start with the base data from API
-        result = {
-            "is_low_tariff": schedule_data.get("is_low_tariff", False),
-            "next_switch": schedule_data.get("next_switch"),
-            "current_period": schedule_data.get("current_period", "normal_tariff"),
-            "today_switches": schedule_data.get("today_switches", [])
-        }
+        result = dict(schedule_data)
 
-        # If we have switches for today, recompute current state precisely
-        switches = schedule_data.get("today_switches", [])
-        if switches:
-            current_state = False  # Default to normal tariff
-            next_switch = None
-
-            for switch in switches:
-                switch_time = switch.get("time")
-                if not switch_time:
-                    continue
-
-                # Ensure switch_time is datetime object
-                if isinstance(switch_time, str):
-                    try:
-                        switch_time = datetime.fromisoformat(switch_time)
-                    except ValueError:
-                        continue
-
-                if switch_time <= now:
-                    current_state = switch["state"]
-                elif next_switch is None:
-                    next_switch = switch_time
-                    break
+        schedule: HdoSchedule | None = schedule_data.get("schedule")
+        if schedule is not None:
+            current_state = schedule.state_at(now)
+            next_switch = schedule.next_transition(now)
 
             # Update result with computed values
             result["is_low_tariff"] = current_state
             result["next_switch"] = next_switch
             result["current_period"] = "low_tariff" if current_state else "normal_tariff"
+            result["stale"] = self._stale_since is not None
+            result["stale_since"] = self._stale_since
+            result["last_error"] = self._last_error
 
             _LOGGER.debug(
                 "HDO state computed: %s, Next switch: %s",
                 "LOW TARIFF" if current_state else "NORMAL TARIFF",
-                next_switch.strftime('%H:%M') if next_switch else "None"
+                next_switch.strftime('%Y-%m-%d %H:%M') if next_switch else "None"
             )
 
+        combined: HdoSchedule | None = schedule_data.get("combined_schedule")
+        if combined is not None and combined.covers(now):
+            result["combined_is_low_tariff"] = combined.state_at(now)
+            result["combined_next_switch"] = combined.next_transition(now)
+        else:
+            result["combined_is_low_tariff"] = None
+            result["combined_next_switch"] = None
+
         return result
 
+    @property
+    def _combined_key(self) -> str:
+        """Return the signals and mode a combined schedule was built for."""
+        return f"{self.combine_mode}:{','.join(sorted(self.combine_signals))}"
+
+    def timeline_values(self, now: datetime | None = None) -> dict[str, Any]:
+        """Return values derived from the schedule for the current minute.
+
+        Computed once per schedule and minute and shared by every sensor.
+        """
+        now = now or self.clock.now()
+        schedule: HdoSchedule | None = (self.data or {}).get("schedule")
+        if schedule is None or self.data.get("error_mode") or not schedule.covers(now):
+            return {}
+
+        minute = to_minute(now)
+        key = (schedule, minute)
+        if key == self._timeline_key:
+            return self._timeline_values
+
+        midnight = datetime.combine(
+            now.astimezone(CEZ_TZ).date() + timedelta(days=1), time(0, 0), CEZ_TZ
+        )
+        next_switch = schedule.next_transition(now)
+        today_end = to_minute(midnight)
+        day_end = minute + 24 * 60
+        self._timeline_values = {
+            "minutes_to_switch": (
+                to_minute(next_switch) - minute if next_switch is not None else None
+            ),
+            # Unknown rather than too low when the schedule ends earlier
+            "low_minutes_remaining_today": (
+                schedule.low_minutes(minute, today_end)
+                if today_end <= schedule.valid_until
+                else None
+            ),
+            "low_minutes_next_24h": (
+                schedule.low_minutes(minute, day_end) if day_end <= schedule.valid_until else None
+            ),
+            "current_period_end": next_switch,
+        }
+        self._timeline_key = key
+        return self._timeline_values
+
+    async def async_tariff_bounds(self, start: int, end: int) -> tuple[array, array]:
+        """Return the low tariff and the known schedule intervals in [start, end).
+
+        The archive answers for the past, the cached schedule from where the
+        archive ends. Both are flat boundaries in epoch minutes.
+        """
+        try:
+            low, covered = await self.hass.async_add_executor_job(
+                self.archive.query, start, end
+            )
+        except OSError as err:
+            raise HomeAssistantError(f"Could not read the schedule archive: {err}") from err
+        if (schedule := self._stored_schedule) is None:
+            return low, covered
+
+        if covered:
+            start = max(start, covered[-1])
+        start = max(start, schedule.valid_from)
+        end = min(end, schedule.valid_until)
+        if start < end:
+            low.extend(schedule.clip(start, end))
+            covered.extend((start, end))
+        return low, covered
+
+    async def async_split_energy(
+        self,
+        statistic_id: str,
+        start: datetime,
+        end: datetime,
+        period: str,
+        resolution: str = "hour",
+    ) -> dict[str, Any]:
+        """Split the energy of a long-term statistic into low and normal tariff.
+
+        The hourly or 5 minute changes of the statistic are split against
+        the schedule all at once and summed per local day or month. Energy
+        outside the known schedule is reported as uncovered.
+        """
+        if "recorder" not in self.hass.config.components:
+            raise HomeAssistantError("The recorder is not running")
+
+        try:
+            stats = await get_instance(self.hass).async_add_executor_job(
+                statistics_during_period,
+                self.hass,
+                start,
+                end,
+                {statistic_id},
+                resolution,
+                {"energy": "kWh"},
+                {"change"},
+            )
+            rows = [
+                row for row in stats.get(statistic_id, []) if row.get("change") is not None
+            ]
+            starts = [int(row["start"] // 60) for row in rows]
+            ends = [int(row["end"] // 60) for row in rows]
+        except KeyError as err:
+            # The recorder is still starting or returned rows without times
+            raise HomeAssistantError(
+                f"Could not read the statistics of {statistic_id}: {err}"
+            ) from err
+        low_bounds, covered_bounds = await self.async_tariff_bounds(
+            to_minute(start), to_minute(end)
+        )
+        low, normal, uncovered = split_energy(
+            low_bounds, covered_bounds, starts, ends, [row["change"] for row in rows]
+        )
+
+        periods = period_starts(
+            start.astimezone(CEZ_TZ).date(),
+            (end - timedelta(microseconds=1)).astimezone(CEZ_TZ).date(),
+            period,
+        )
+        totals = totals_by_period(starts, periods, low, normal, uncovered)
+        return {
+            "statistic_id": statistic_id,
+            "unit": "kWh",
+            "periods": [
+                {
+                    "start": day.isoformat(),
+                    "low": round(totals[0][i], 3),
+                    "normal": round(totals[1][i], 3),
+                    "uncovered": round(totals[2][i], 3),
+                }
+                for i, day in enumerate(periods)
+            ],
+            "low": round(sum(totals[0]), 3),
+            "normal": round(sum(totals[1]), 3),
+            "uncovered": round(sum(totals[2]), 3),
+        }
+
+    @callback
+    def async_add_minute_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback at the start of every minute.
+
+        One timer per coordinator serves all listeners and only runs while
+        there are any.
+        """
+        self._minute_listeners.append(update_callback)
+        if self._unsub_minute is None:
+            self._unsub_minute = self.clock.async_track_time_change(
+                self.hass, self._async_handle_minute, second=0
+            )
+
+        @callback
+        def _remove_listener() -> None:
+            self._minute_listeners.remove(update_callback)
+            if not self._minute_listeners and self._unsub_minute is not None:
+                self._unsub_minute()
+                self._unsub_minute = None
+
+        return _remove_listener
+
+    @callback
+    def _async_handle_minute(self, _now: datetime) -> None:
+        """Notify the minute listeners."""
+        for update_callback in list(self._minute_listeners):
+            update_callback()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing a response until its state is written.
+
+        Updates that no response caused, such as switches, are not timed.
+        """
+        received, self._response_received = self._response_received, None
+        super().async_update_listeners()
+        if received is not None:
+            self.metrics.state_write.record(perf_counter() - received)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return metrics of this coordinator, its API client and the hub."""
+        fetch = self.hub.fetch_metrics.get(self.ean)
+        return {
+            "metrics": self.metrics.as_dict(),
+            "fetch": fetch.as_dict() if fetch is not None else None,
+            "hub": self.hub.stats,
+            "retry_in": round(self.hub.retry_in(self.ean), 1),
+        }
+
     async def async_shutdown(self) -> None:
-        """Close the API session when shutting down."""
+        """Cancel timers and detach from the hub when shutting down."""
+        await self._async_archive(self.clock.now())
+        self._async_cancel_switch()
+        self._async_cancel_prefetch()
+        self._unsub_hub()
+        await super().async_shutdown()
         await self.api.async_close()
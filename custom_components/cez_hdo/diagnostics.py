@@ -0,0 +1,47 @@
+"""Diagnostics support for CEZ HDO."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EAN, DOMAIN
+from .coordinator import CezHdoCoordinator
+from .schedule import from_minute
+
+TO_REDACT = {CONF_EAN, "ean"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: CezHdoCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data or {}
+
+    schedule = data.get("schedule")
+    schedule_info = None
+    if schedule is not None:
+        schedule_info = {
+            "intervals": len(schedule),
+            "valid_from": from_minute(schedule.valid_from).isoformat(),
+            "valid_until": from_minute(schedule.valid_until).isoformat(),
+            "fingerprint": data.get("fingerprint"),
+        }
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "state": {
+            "is_low_tariff": data.get("is_low_tariff"),
+            "next_switch": data.get("next_switch"),
+            "error_mode": data.get("error_mode", False),
+            "error_message": data.get("error_message"),
+            "stale": data.get("stale", False),
+            "last_error": data.get("last_error"),
+            "last_update_success": coordinator.last_update_success,
+        },
+        "schedule": schedule_info,
+        **async_redact_data(coordinator.diagnostics(), TO_REDACT),
+    }
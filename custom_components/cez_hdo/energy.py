@@ -0,0 +1,143 @@
+"""Split energy statistics into low and normal tariff for CEZ HDO.
+
+Buckets of consumption, such as the hourly changes of a long-term
+statistic, are given as arrays of start and end epoch minutes and energy.
+The low tariff part of every bucket is found for all buckets at once with
+a sorted search over prefix sums of the low tariff intervals, assuming the
+energy of a bucket was used evenly over it. NumPy is used when available,
+with a pure Python fallback.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import date, datetime, time
+from typing import Any
+
+from .schedule import CEZ_TZ, to_minute
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional, see the pure Python fallback
+    np = None
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+
+
+def _cumulative(bounds: Sequence[int]) -> list[int]:
+    """Return the interval minutes before each interval, plus the total."""
+    cumulative = [0]
+    for i in range(0, len(bounds), 2):
+        cumulative.append(cumulative[-1] + bounds[i + 1] - bounds[i])
+    return cumulative
+
+
+def minutes_before(bounds: Sequence[int], minutes: Sequence[int]) -> Any:
+    """Return the minutes inside the intervals before each given minute.
+
+    bounds are flat sorted interval boundaries [start0, end0, ...].
+    """
+    cumulative = _cumulative(bounds)
+    if np is not None:
+        minutes_np = np.asarray(minutes, dtype=np.int64)
+        if not len(bounds):
+            return np.zeros(len(minutes_np), dtype=np.int64)
+        bounds_np = np.asarray(bounds, dtype=np.int64)
+        index = np.searchsorted(bounds_np, minutes_np, side="right")
+        # Inside an interval, add the part since its start
+        previous = bounds_np[np.maximum(index - 1, 0)]
+        partial = np.where(index % 2 == 1, minutes_np - previous, 0)
+        return np.asarray(cumulative, dtype=np.int64)[index // 2] + partial
+
+    result = []
+    for minute in minutes:
+        index = bisect_right(bounds, minute)
+        value = cumulative[index // 2]
+        if index % 2:
+            value += minute - bounds[index - 1]
+        result.append(value)
+    return result
+
+
+def split_energy(
+    low_bounds: Sequence[int],
+    covered_bounds: Sequence[int],
+    starts: Sequence[int],
+    ends: Sequence[int],
+    energy: Sequence[float],
+) -> tuple[Any, Any, Any]:
+    """Split every bucket into low tariff, normal tariff and uncovered energy.
+
+    covered_bounds are the intervals for which the schedule is known and
+    low_bounds the low tariff intervals within them. Energy of a bucket
+    outside the known schedule is returned as uncovered.
+    """
+    low_before = minutes_before(low_bounds, starts)
+    low_until = minutes_before(low_bounds, ends)
+    covered_before = minutes_before(covered_bounds, starts)
+    covered_until = minutes_before(covered_bounds, ends)
+
+    if np is not None:
+        energy_np = np.asarray(energy, dtype=np.float64)
+        length = np.maximum(np.asarray(ends) - np.asarray(starts), 1)
+        low = energy_np * (low_until - low_before) / length
+        uncovered = energy_np * (1 - (covered_until - covered_before) / length)
+        return low, energy_np - low - uncovered, uncovered
+
+    low_values, normal_values, uncovered_values = [], [], []
+    for i, value in enumerate(energy):
+        length = max(ends[i] - starts[i], 1)
+        low = value * (low_until[i] - low_before[i]) / length
+        uncovered = value * (1 - (covered_until[i] - covered_before[i]) / length)
+        low_values.append(low)
+        normal_values.append(value - low - uncovered)
+        uncovered_values.append(uncovered)
+    return low_values, normal_values, uncovered_values
+
+
+def period_starts(first: date, last: date, period: str) -> list[date]:
+    """Return the local days or months starting in [first, last]."""
+    if period == PERIOD_MONTH:
+        day = first.replace(day=1)
+    else:
+        day = first
+    days = []
+    while day <= last:
+        days.append(day)
+        if period == PERIOD_MONTH:
+            day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        else:
+            day = date.fromordinal(day.toordinal() + 1)
+    return days
+
+
+def totals_by_period(
+    starts: Sequence[int], periods: list[date], *values: Sequence[float]
+) -> list[list[float]]:
+    """Sum values per period, a bucket counting for the period it starts in.
+
+    periods are the local start days of consecutive periods, so summing is
+    one sorted search of the bucket starts into the period starts.
+    """
+    edges = [to_minute(datetime.combine(day, time(0, 0), CEZ_TZ)) for day in periods]
+    if np is not None:
+        index = np.searchsorted(
+            np.asarray(edges, dtype=np.int64), np.asarray(starts, dtype=np.int64), side="right"
+        ) - 1
+        valid = index >= 0
+        return [
+            np.bincount(index[valid], weights=np.asarray(value)[valid], minlength=len(edges))
+            .tolist()
+            for value in values
+        ]
+
+    totals = [[0.0] * len(edges) for _ in values]
+    for i, start in enumerate(starts):
+        index = bisect_right(edges, start) - 1
+        if index < 0:
+            continue
+        for total, value in zip(totals, values):
+            total[index] += value[i]
+    return totals
+
@@ -0,0 +1,323 @@
+"""Bulk schedule fetching for many EANs, without Home Assistant.
+
+Only aiohttp and the Home Assistant independent modules of this package
+are used. From the repository root:
+
+    python cez_hdo_fleet.py eans.txt --concurrency 20 --output schedules.jsonl
+    echo "859182400000000001 a3b4dp01,a3b4dp02" | python cez_hdo_fleet.py -
+
+Every input line holds an EAN, optionally followed by signals separated by
+commas or spaces; lines starting with # are ignored. Each EAN is fetched
+once for all of its signals, and one JSON line per EAN and signal is
+written as soon as its response has been parsed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, TextIO
+
+import aiohttp
+
+from .api import CezHdoApiError, async_fetch_signals
+from .const import (
+    CEZ_API_URL,
+    DEFAULT_SIGNAL,
+    FLEET_CONCURRENCY,
+    FLEET_MAX_RETRY_DELAY,
+    FLEET_RETRIES,
+    FLEET_RETRY_DELAY,
+    FLEET_TIMEOUT,
+)
+from .metrics import FetchMetrics
+from .schedule import CEZ_TZ, from_minute, parse_signals, signal_fingerprint
+from .throttle import Backoff, TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FleetJob:
+    """Signals to fetch for one EAN; None for every signal in the response."""
+
+    ean: str
+    signals: tuple[str, ...] | None
+
+
+def parse_jobs(lines: Iterable[str], default_signals: tuple[str, ...] | None) -> list[FleetJob]:
+    """Read EAN lines, merging the signals of EANs listed more than once."""
+    wanted: dict[str, set[str] | None] = {}
+    for line in lines:
+        parts = line.replace(",", " ").split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        ean, signals = parts[0], parts[1:] or default_signals
+        if ean in wanted and wanted[ean] is None:
+            continue
+        if signals is None:
+            wanted[ean] = None
+        else:
+            wanted.setdefault(ean, set()).update(signals)
+    return [
+        FleetJob(ean, tuple(sorted(signals)) if signals is not None else None)
+        for ean, signals in wanted.items()
+    ]
+
+
+def normalize(
+    ean: str,
+    signal: str,
+    signals_data: list[dict[str, Any]],
+    fetched_at: datetime,
+    minutes: bool = False,
+) -> dict[str, Any]:
+    """Return the schedule of one signal as a JSON serializable record.
+
+    Intervals are ISO timestamps in CEZ local time, or epoch minutes.
+    """
+    record: dict[str, Any] = {
+        "ean": ean,
+        "signal": signal,
+        "fetched_at": fetched_at.isoformat(),
+    }
+    schedule = parse_signals(signals_data, signal)
+    if schedule is None:
+        record["error"] = f"Signal '{signal}' not found in response"
+        return record
+
+    def _time(minute: int) -> int | str:
+        return minute if minutes else from_minute(minute).isoformat()
+
+    bounds = schedule.bounds
+    record["valid_from"] = _time(schedule.valid_from)
+    record["valid_until"] = _time(schedule.valid_until)
+    record["fingerprint"] = signal_fingerprint(signals_data, signal)
+    record["intervals"] = [
+        [_time(bounds[i]), _time(bounds[i + 1])] for i in range(0, len(bounds), 2)
+    ]
+    return record
+
+
+class FleetFetcher:
+    """Fetch many EANs with bounded concurrency over one pooled session.
+
+    Failed requests are retried with exponential, jittered backoff per EAN,
+    and an optional token bucket caps the request rate of the whole run.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        concurrency: int = FLEET_CONCURRENCY,
+        retries: int = FLEET_RETRIES,
+        retry_delay: float = FLEET_RETRY_DELAY,
+        max_retry_delay: float = FLEET_MAX_RETRY_DELAY,
+        timeout: float = FLEET_TIMEOUT,
+        rate: float | None = None,
+        minutes: bool = False,
+        api_url: str = CEZ_API_URL,
+    ) -> None:
+        """Initialize the fetcher; rate is in requests per second."""
+        self._session = session
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.timeout = timeout
+        self.minutes = minutes
+        self._api_url = api_url
+        self._budget = TokenBucket(max(1.0, rate), 1 / rate) if rate else None
+        self.metrics = FetchMetrics()
+        self.requests = 0
+        self.retried = 0
+        self.failed_eans = 0
+
+    async def async_stream(self, jobs: list[FleetJob]) -> AsyncIterator[dict[str, Any]]:
+        """Yield the records of every job in the order they complete."""
+        pending: asyncio.Queue[FleetJob] = asyncio.Queue()
+        for job in jobs:
+            pending.put_nowait(job)
+        # Bounded, so slow consumers hold the workers back
+        results: asyncio.Queue[list[dict[str, Any]]] = asyncio.Queue(self.concurrency)
+
+        async def _worker() -> None:
+            while not pending.empty():
+                job = pending.get_nowait()
+                try:
+                    records = await self.async_fetch(job)
+                except Exception as err:  # pylint: disable=broad-except
+                    # Every job must yield records, or the stream would wait forever
+                    _LOGGER.exception("Unexpected error fetching %s", job.ean)
+                    self.failed_eans += 1
+                    records = self._error_records(job, str(err) or type(err).__name__)
+                await results.put(records)
+
+        workers = [
+            asyncio.create_task(_worker()) for _ in range(min(self.concurrency, len(jobs)))
+        ]
+        try:
+            for _ in range(len(jobs)):
+                for record in await results.get():
+                    yield record
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def async_fetch(self, job: FleetJob) -> list[dict[str, Any]]:
+        """Fetch one EAN, retrying failures, and return one record per signal."""
+        backoff = Backoff(self.retry_delay, self.max_retry_delay, self.retries + 1)
+        while True:
+            if self._budget is not None:
+                while not self._budget.try_acquire():
+                    await asyncio.sleep(self._budget.wait_time())
+            self.requests += 1
+            try:
+                data = await async_fetch_signals(
+                    self._session, job.ean, job.signals, self.metrics, self._api_url, self.timeout
+                )
+                signals_data = data["data"]["signals"]
+                if not isinstance(signals_data, list):
+                    raise ValueError("Response holds no list of signals")
+                break
+            except (
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                CezHdoApiError,
+                ValueError,
+                KeyError,
+                TypeError,
+            ) as err:
+                error = str(err) or type(err).__name__
+                if backoff.failures >= self.retries:
+                    self.failed_eans += 1
+                    _LOGGER.warning("Giving up on %s after %d attempts: %s",
+                                    job.ean, backoff.failures + 1, error)
+                    return self._error_records(job, error)
+                delay = backoff.record_failure()
+                self.retried += 1
+                _LOGGER.debug("Fetching %s failed (%s), retrying in %.1f s", job.ean, error, delay)
+                await asyncio.sleep(delay)
+
+        fetched_at = datetime.now(CEZ_TZ)
+        signals = job.signals or sorted(
+            {entry.get("signal") for entry in signals_data if entry.get("signal")}
+        )
+        return [
+            normalize(job.ean, signal, signals_data, fetched_at, self.minutes)
+            for signal in signals
+        ]
+
+    @staticmethod
+    def _error_records(job: FleetJob, error: str) -> list[dict[str, Any]]:
+        """Return one error record per signal of job."""
+        return [
+            {"ean": job.ean, "signal": signal, "error": error}
+            for signal in job.signals or (None,)
+        ]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return request counters of the run."""
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed_eans": self.failed_eans,
+            "fetch": self.metrics.as_dict(),
+        }
+
+
+async def async_run(
+    jobs: list[FleetJob], output: TextIO, fetcher_args: dict[str, Any], connections: int
+) -> dict[str, Any]:
+    """Fetch every job and write its records as JSON lines."""
+    started = time.perf_counter()
+    records = errors = 0
+    connector = aiohttp.TCPConnector(limit=connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        fetcher = FleetFetcher(session, **fetcher_args)
+        async for record in fetcher.async_stream(jobs):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            records += 1
+            errors += "error" in record
+    elapsed = time.perf_counter() - started
+    return {
+        "eans": len(jobs),
+        "records": records,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "eans_per_second": round(len(jobs) / elapsed, 1) if elapsed else None,
+        **fetcher.stats,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the fleet fetcher."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("input", help="file with one EAN per line, - for stdin")
+    parser.add_argument("--output", "-o", help="JSON lines file, stdout by default")
+    parser.add_argument("--signal", action="append", dest="signals",
+                        help=f"signal for EANs listed without one, repeatable "
+                             f"(default {DEFAULT_SIGNAL})")
+    parser.add_argument("--all-signals", action="store_true",
+                        help="write every signal of EANs listed without one")
+    parser.add_argument("--concurrency", type=int, default=FLEET_CONCURRENCY,
+                        help="EANs fetched at the same time")
+    parser.add_argument("--connections", type=int, default=FLEET_CONCURRENCY,
+                        help="connection pool size")
+    parser.add_argument("--rate", type=float, help="maximum requests per second")
+    parser.add_argument("--retries", type=int, default=FLEET_RETRIES,
+                        help="further attempts per EAN after a failure")
+    parser.add_argument("--retry-delay", type=float, default=FLEET_RETRY_DELAY,
+                        help="seconds before the first retry, doubled per failure")
+    parser.add_argument("--max-retry-delay", type=float, default=FLEET_MAX_RETRY_DELAY)
+    parser.add_argument("--timeout", type=float, default=FLEET_TIMEOUT,
+                        help="seconds per request")
+    parser.add_argument("--minutes", action="store_true",
+                        help="write epoch minutes instead of ISO timestamps")
+    parser.add_argument("--api-url", default=CEZ_API_URL, help=argparse.SUPPRESS)
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    default_signals = None if args.all_signals else tuple(args.signals or [DEFAULT_SIGNAL])
+
+    if args.input == "-":
+        jobs = parse_jobs(sys.stdin, default_signals)
+    else:
+        with open(args.input, encoding="utf-8") as file:
+            jobs = parse_jobs(file, default_signals)
+
+    fetcher_args = {
+        "concurrency": args.concurrency,
+        "retries": args.retries,
+        "retry_delay": args.retry_delay,
+        "max_retry_delay": args.max_retry_delay,
+        "timeout": args.timeout,
+        "rate": args.rate,
+        "minutes": args.minutes,
+        "api_url": args.api_url,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            summary = asyncio.run(async_run(jobs, output, fetcher_args, args.connections))
+    else:
+        summary = asyncio.run(async_run(jobs, sys.stdout, fetcher_args, args.connections))
+
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed_eans"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Shared per-EAN fetch hub for CEZ HDO."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Collection
+from typing import Any
+
+import aiohttp
+
+from .api import CezHdoRequestDeferred, async_fetch_signals
+from .const import (
+    BACKOFF_BASE_DELAY,
+    BACKOFF_MAX_DELAY,
+    CEZ_API_URL,
+    CIRCUIT_FAILURE_THRESHOLD,
+    HUB_RESPONSE_TTL,
+    REQUEST_BUDGET_CAPACITY,
+    REQUEST_BUDGET_REFILL,
+)
+from .metrics import FetchMetrics
+from .throttle import Backoff, TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _includes(have: frozenset[str] | None, wanted: frozenset[str] | None) -> bool:
+    """Return True if a response holding the signals have serves wanted.
+
+    None stands for the complete response with every signal.
+    """
+    if have is None:
+        return True
+    return wanted is not None and wanted <= have
+
+
+class CezHdoHub:
+    """Fetch CEZ responses once per EAN and share them.
+
+    One response carries every signal of an EAN, so all clients of the same
+    EAN share it: concurrent requests are collapsed into a single in-flight
+    fetch, a response is reused for a short while after it arrived, and
+    every fetched response is handed to all subscribers of that EAN.
+
+    Failing EANs back off exponentially, and all upstream requests draw
+    from one token bucket. Requests held back by either raise
+    CezHdoRequestDeferred without touching the network.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_url: str = CEZ_API_URL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the hub with a pooled session it does not own."""
+        self._session = session
+        self._api_url = api_url
+        self._clock = clock
+        self._inflight: dict[str, tuple[frozenset[str] | None, asyncio.Task[dict[str, Any]]]] = {}
+        # Expiry, signals kept and the response itself
+        self._responses: dict[str, tuple[float, frozenset[str] | None, dict[str, Any]]] = {}
+        self._subscribers: dict[
+            str, list[tuple[frozenset[str], Callable[[dict[str, Any]], None]]]
+        ] = {}
+        self._backoffs: dict[str, Backoff] = {}
+        self.fetch_metrics: dict[str, FetchMetrics] = {}
+        self._budget = TokenBucket(REQUEST_BUDGET_CAPACITY, REQUEST_BUDGET_REFILL, clock)
+        self.upstream_requests = 0
+        self.saved_requests = 0
+        self.deferred_requests = 0
+
+    async def async_get(
+        self, ean: str, signals: Collection[str] | None = None
+    ) -> dict[str, Any]:
+        """Return the raw response for an EAN, fetching it at most once.
+
+        With signals, the response is streamed and only entries of those
+        signals and of every subscribed signal of the EAN are kept. Without
+        signals the whole response is returned.
+        """
+        wanted = frozenset(signals) if signals is not None else None
+
+        cached = self._responses.get(ean)
+        if (
+            cached is not None
+            and self._clock() < cached[0]
+            and _includes(cached[1], wanted)
+        ):
+            self.saved_requests += 1
+            return cached[2]
+
+        inflight = self._inflight.get(ean)
+        if inflight is not None and _includes(inflight[0], wanted):
+            self.saved_requests += 1
+            task = inflight[1]
+        else:
+            self._async_check_throttle(ean)
+            if wanted is not None:
+                wanted = wanted.union(
+                    *(subscribed for subscribed, _ in self._subscribers.get(ean, ()))
+                )
+            task = asyncio.create_task(self._async_fetch(ean, wanted))
+            self._inflight[ean] = (wanted, task)
+            task.add_done_callback(lambda done: self._async_fetch_done(ean, done))
+
+        # A cancelled waiter must not cancel the fetch shared with others
+        return await asyncio.shield(task)
+
+    async def async_discover(self, ean: str) -> dict[str, Any]:
+        """Fetch the complete response of an EAN without keeping any state.
+
+        Used by the config flow for EANs that may never get an entry, so the
+        request draws from the budget but leaves no response, backoff or
+        metrics behind.
+        """
+        self._async_take_budget()
+        self.upstream_requests += 1
+        return await self._async_request(ean, None, None)
+
+    def _async_check_throttle(self, ean: str) -> None:
+        """Raise if backoff or the request budget holds a new request back."""
+        backoff = self._backoffs.get(ean)
+        if backoff is not None and (retry_in := backoff.retry_in()) > 0:
+            self.deferred_requests += 1
+            raise CezHdoRequestDeferred(
+                f"Backing off after {backoff.failures} failed requests, "
+                f"retrying in {retry_in:.0f} s",
+                retry_in,
+            )
+        self._async_take_budget()
+
+    def _async_take_budget(self) -> None:
+        """Raise if the request budget holds a new request back."""
+        if not self._budget.try_acquire():
+            self.deferred_requests += 1
+            retry_in = self._budget.wait_time()
+            raise CezHdoRequestDeferred(
+                f"Request budget exhausted, retrying in {retry_in:.0f} s", retry_in
+            )
+
+    def retry_in(self, ean: str) -> float:
+        """Return the seconds until a request for an EAN may be sent."""
+        backoff = self._backoffs.get(ean)
+        return backoff.retry_in() if backoff is not None else 0.0
+
+    def _async_fetch_done(self, ean: str, task: asyncio.Task[dict[str, Any]]) -> None:
+        """Forget a finished in-flight fetch."""
+        inflight = self._inflight.get(ean)
+        if inflight is not None and inflight[1] is task:
+            del self._inflight[ean]
+
+    async def _async_fetch(self, ean: str, signals: frozenset[str] | None) -> dict[str, Any]:
+        """Fetch one EAN upstream and fan the response out."""
+        self.upstream_requests += 1
+        backoff = self._backoffs.setdefault(
+            ean,
+            Backoff(
+                BACKOFF_BASE_DELAY, BACKOFF_MAX_DELAY, CIRCUIT_FAILURE_THRESHOLD, self._clock
+            ),
+        )
+        try:
+            data = await self._async_request(
+                ean, signals, self.fetch_metrics.setdefault(ean, FetchMetrics())
+            )
+        except Exception:
+            delay = backoff.record_failure()
+            _LOGGER.debug(
+                "Fetch for %s failed %d times in a row, next attempt in %.0f s%s",
+                ean, backoff.failures, delay, " (circuit open)" if backoff.is_open else "",
+            )
+            raise
+        backoff.record_success()
+        self._responses[ean] = (self._clock() + HUB_RESPONSE_TTL, signals, data)
+
+        for subscribed, subscriber in list(self._subscribers.get(ean, ())):
+            if not _includes(signals, subscribed):
+                continue
+            try:
+                subscriber(data)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handing CEZ response for %s to a subscriber", ean)
+        return data
+
+    async def _async_request(
+        self, ean: str, signals: frozenset[str] | None, metrics: FetchMetrics | None
+    ) -> dict[str, Any]:
+        """Send one upstream request."""
+        return await async_fetch_signals(self._session, ean, signals, metrics, self._api_url)
+
+    def prime(self, ean: str, data: dict[str, Any], expires: float) -> None:
+        """Share a complete response fetched elsewhere until expires.
+
+        expires is a value of the hub's clock, time.monotonic() by default.
+        Used by the config flow, so that the entry it creates starts from
+        the response it validated.
+        """
+        if expires > self._clock():
+            self._responses[ean] = (expires, None, data)
+
+    def subscribe(
+        self,
+        ean: str,
+        signals: Collection[str],
+        subscriber: Callable[[dict[str, Any]], None],
+    ) -> Callable[[], None]:
+        """Receive every response fetched for an EAN that holds the signals.
+
+        Returns a function that cancels the subscription. Once the last
+        subscriber of an EAN is gone, everything kept for it is dropped.
+        """
+        entry = (frozenset(signals), subscriber)
+        self._subscribers.setdefault(ean, []).append(entry)
+
+        def _unsubscribe() -> None:
+            subscribers = self._subscribers.get(ean, [])
+            if entry in subscribers:
+                subscribers.remove(entry)
+            if not subscribers:
+                self._subscribers.pop(ean, None)
+                self._responses.pop(ean, None)
+                self._backoffs.pop(ean, None)
+                self.fetch_metrics.pop(ean, None)
+
+        return _unsubscribe
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return request counters."""
+        return {
+            "upstream_requests": self.upstream_requests,
+            "saved_requests": self.saved_requests,
+            "deferred_requests": self.deferred_requests,
+            "budget_tokens": round(self._budget.tokens, 2),
+            "open_circuits": sum(backoff.is_open for backoff in self._backoffs.values()),
+        }
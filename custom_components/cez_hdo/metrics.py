@@ -0,0 +1,97 @@
+"""Runtime metrics for CEZ HDO."""
+from __future__ import annotations
+
+from typing import Any
+
+
+class DurationStat:
+    """Running statistics of a duration in seconds."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self) -> None:
+        """Initialize an empty statistic."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last: float | None = None
+
+    def record(self, seconds: float) -> None:
+        """Add one measurement."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistic in milliseconds."""
+        return {
+            "count": self.count,
+            "last_ms": round(self.last * 1000, 3) if self.last is not None else None,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class FetchMetrics:
+    """Metrics of the upstream requests for one EAN."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.latency = DurationStat()
+        self.bytes_received = 0
+        self.last_bytes: int | None = None
+        self.last_status: int | None = None
+        self.statuses: dict[str, int] = {}
+
+    def record(self, seconds: float, status: int | str, size: int | None) -> None:
+        """Record one finished request; status may name an exception."""
+        self.latency.record(seconds)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if isinstance(status, int):
+            self.last_status = status
+        if size is not None:
+            self.bytes_received += size
+            self.last_bytes = size
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics."""
+        return {
+            "latency": self.latency.as_dict(),
+            "last_status": self.last_status,
+            "statuses": dict(self.statuses),
+            "bytes_received": self.bytes_received,
+            "last_bytes": self.last_bytes,
+        }
+
+
+class CezHdoMetrics:
+    """Metrics of one API client and its coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.parse = DurationStat()
+        self.state_write = DurationStat()
+        self.switch_lag = DurationStat()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.unchanged_responses = 0
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Return the share of requests answered from the cache."""
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics."""
+        ratio = self.cache_hit_ratio
+        return {
+            "parse": self.parse.as_dict(),
+            "state_write": self.state_write.as_dict(),
+            "switch_lag": self.switch_lag.as_dict(),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": round(ratio, 4) if ratio is not None else None,
+            "unchanged_responses": self.unchanged_responses,
+        }
@@ -0,0 +1,192 @@
+"""Local timeline endpoint for CEZ HDO field devices.
+
+Relay boards and PLCs fetch the low tariff timeline once, switch locally
+at its boundaries and only come back when the schedule version changes:
+
+    GET /api/cez_hdo/timeline/<ean>?signal=<signal>&wait=<seconds>
+    Authorization: Bearer <long-lived access token>
+    If-None-Match: <ETag of the last response>
+
+The ETag is the schedule version. With a matching If-None-Match the
+request waits up to wait seconds for a new version and answers 304 if
+none arrives, so a device can hold one long-poll open at a time. Times
+are epoch seconds, answered from the coordinator's in-memory data.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import struct
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_PUSH_VIEW, DOMAIN, PUSH_MAX_WAIT
+from .coordinator import CezHdoCoordinator
+from .schedule import HdoSchedule
+
+VERSION_ERROR = "error"
+
+
+def schedule_version(data: dict[str, Any] | None) -> str:
+    """Return a short version of the timeline a device switches by."""
+    if not data or data.get("error_mode") or data.get("schedule") is None:
+        return VERSION_ERROR
+    digest = hashlib.blake2s(digest_size=8)
+    for schedule in (data["schedule"], data.get("combined_schedule")):
+        if schedule is not None:
+            digest.update(struct.pack("<qq", schedule.valid_from, schedule.valid_until))
+            digest.update(schedule.bounds.tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def _intervals(schedule: HdoSchedule) -> list[list[int]]:
+    """Return the low tariff intervals in epoch seconds."""
+    bounds = schedule.bounds
+    return [[bounds[i] * 60, bounds[i + 1] * 60] for i in range(0, len(bounds), 2)]
+
+
+def _timestamp(moment: datetime | None) -> int | None:
+    """Return a datetime in epoch seconds."""
+    return int(moment.timestamp()) if moment is not None else None
+
+
+def _requested_version(request: web.Request) -> str | None:
+    """Return the version a device already has, from If-None-Match."""
+    if (etag := request.headers.get("If-None-Match")) is None:
+        return None
+    # Devices may drop the weak prefix or the quotes
+    return etag.strip().removeprefix("W/").strip('"')
+
+
+class CezHdoTimelineView(HomeAssistantView):
+    """Serve the timeline of entries that enabled the endpoint."""
+
+    url = "/api/cez_hdo/timeline/{ean}"
+    name = "api:cez_hdo:timeline"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the view."""
+        self.hass = hass
+        # Serialized timelines per entry, rebuilt when the version changes
+        self._timelines: dict[tuple[str, str], tuple[str, dict[str, Any]]] = {}
+
+    def _coordinator(self, ean: str, signal: str | None) -> CezHdoCoordinator | None:
+        """Return the entry serving ean and signal, if it enabled the endpoint."""
+        for coordinator in self.hass.data.get(DOMAIN, {}).values():
+            if (
+                coordinator.push_endpoint
+                and coordinator.ean == ean
+                and (signal is None or coordinator.signal == signal)
+            ):
+                return coordinator
+        return None
+
+    def _timeline(self, coordinator: CezHdoCoordinator, version: str) -> dict[str, Any]:
+        """Return the part of the response that only changes with the version."""
+        key = (coordinator.ean, coordinator.signal)
+        cached = self._timelines.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        data = coordinator.data or {}
+        timeline: dict[str, Any] = {
+            "ean": coordinator.ean,
+            "signal": coordinator.signal,
+            "version": version,
+        }
+        if version == VERSION_ERROR:
+            # No usable schedule, devices fall back to low tariff for safety
+            timeline.update(valid_from=None, valid_until=None, intervals=[])
+        else:
+            schedule: HdoSchedule = data["schedule"]
+            timeline.update(
+                valid_from=schedule.valid_from * 60,
+                valid_until=schedule.valid_until * 60,
+                intervals=_intervals(schedule),
+            )
+            if (combined := data.get("combined_schedule")) is not None:
+                timeline["combined_intervals"] = _intervals(combined)
+        self._timelines[key] = (version, timeline)
+        return timeline
+
+    @callback
+    def async_forget(self, coordinator: CezHdoCoordinator) -> None:
+        """Drop the cached timeline of an entry that is unloaded."""
+        self._timelines.pop((coordinator.ean, coordinator.signal), None)
+
+    async def _async_wait_for_change(
+        self, coordinator: CezHdoCoordinator, version: str, wait: float
+    ) -> None:
+        """Wait up to wait seconds for the version to differ from version."""
+        changed = self.hass.loop.create_future()
+
+        @callback
+        def _handle_update() -> None:
+            if not changed.done() and schedule_version(coordinator.data) != version:
+                changed.set_result(None)
+
+        unsub = coordinator.async_add_listener(_handle_update)
+        try:
+            await asyncio.wait_for(changed, wait)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            unsub()
+
+    async def get(self, request: web.Request, ean: str) -> web.Response:
+        """Answer with the timeline, or 304 once it did not change in time."""
+        coordinator = self._coordinator(ean, request.query.get("signal"))
+        if coordinator is None:
+            return self.json_message("No CEZ HDO entry serves this EAN", HTTPStatus.NOT_FOUND)
+        try:
+            wait = min(max(float(request.query.get("wait", 0)), 0), PUSH_MAX_WAIT)
+        except ValueError:
+            return self.json_message("wait must be a number", HTTPStatus.BAD_REQUEST)
+
+        version = schedule_version(coordinator.data)
+        known = _requested_version(request)
+        if known == version:
+            if wait:
+                await self._async_wait_for_change(coordinator, version, wait)
+                version = schedule_version(coordinator.data)
+            if known == version:
+                return web.Response(
+                    status=HTTPStatus.NOT_MODIFIED, headers={"ETag": f'W/"{version}"'}
+                )
+
+        data = coordinator.data or {}
+        error_mode = version == VERSION_ERROR
+        response = {
+            **self._timeline(coordinator, version),
+            "server_time": _timestamp(coordinator.clock.now()),
+            "is_low_tariff": True if error_mode else bool(data.get("is_low_tariff")),
+            "next_switch": None if error_mode else _timestamp(data.get("next_switch")),
+            "error_mode": error_mode,
+            "stale": bool(data.get("stale")),
+        }
+        return self.json(
+            response, headers={"ETag": f'W/"{version}"', "Cache-Control": "no-cache"}
+        )
+
+
+@callback
+def async_register_push_view(hass: HomeAssistant) -> None:
+    """Register the timeline endpoint once, for every entry that enables it."""
+    if hass.data.get(DATA_PUSH_VIEW):
+        return
+    view = CezHdoTimelineView(hass)
+    hass.http.register_view(view)
+    hass.data[DATA_PUSH_VIEW] = view
+
+
+@callback
+def async_forget_timeline(hass: HomeAssistant, coordinator: CezHdoCoordinator) -> None:
+    """Drop the cached timeline of an entry, the view itself stays registered."""
+    if (view := hass.data.get(DATA_PUSH_VIEW)) is not None:
+        view.async_forget(coordinator)
@@ -0,0 +1,319 @@
+"""Compact low tariff schedule for CEZ HDO."""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+from array import array
+from bisect import bisect_right
+from collections.abc import Collection, Sequence
+from datetime import date, datetime, time, timedelta, tzinfo
+from itertools import groupby
+from operator import itemgetter
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from .const import CEZ_TIMEZONE
+
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FORMAT = "%d.%m.%Y"
+
+# Times in the CEZ response are local Czech wall clock times
+CEZ_TZ = ZoneInfo(CEZ_TIMEZONE)
+
+
+def cez_now() -> datetime:
+    """Return the current time in CEZ local time, the default clock."""
+    return datetime.now(CEZ_TZ)
+
+
+def to_minute(moment: datetime) -> int:
+    """Convert a datetime to minutes since the epoch.
+
+    Naive datetimes are taken as CEZ local time.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=CEZ_TZ)
+    return int(moment.timestamp()) // 60
+
+
+def from_minute(minute: int, tz: tzinfo = CEZ_TZ) -> datetime:
+    """Convert minutes since the epoch to an aware datetime."""
+    return datetime.fromtimestamp(minute * 60, tz)
+
+
+class HdoSchedule:
+    """Sorted, merged low tariff intervals spanning one or more days.
+
+    Interval boundaries are stored flat as epoch minutes in an array:
+    ``[start0, end0, start1, end1, ...]``. The number of boundaries at or
+    before a moment tells the state (odd means low tariff) and the next
+    boundary is the next switch, so both lookups are a single bisect.
+    """
+
+    __slots__ = ("bounds", "valid_from", "valid_until", "_cumulative")
+
+    def __init__(self, bounds: array, valid_from: int, valid_until: int) -> None:
+        """Initialize from already merged boundaries in epoch minutes."""
+        self.bounds = bounds
+        self.valid_from = valid_from
+        self.valid_until = valid_until
+        self._cumulative: array | None = None
+
+    @classmethod
+    def from_intervals(
+        cls, intervals: list[tuple[int, int]], valid_from: int, valid_until: int
+    ) -> HdoSchedule:
+        """Build a schedule, merging overlapping and adjacent intervals."""
+        bounds = array("q")
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if bounds and start <= bounds[-1]:
+                if end > bounds[-1]:
+                    bounds[-1] = end
+                continue
+            bounds.append(start)
+            bounds.append(end)
+        return cls(bounds, valid_from, valid_until)
+
+    @classmethod
+    def combine(cls, schedules: Sequence[HdoSchedule], intersection: bool = False) -> HdoSchedule:
+        """Merge several schedules into their union or intersection.
+
+        The sorted boundary arrays are swept in one pass, counting how many
+        schedules are low at each boundary. The result is only valid where
+        every schedule has data.
+        """
+        required = len(schedules) if intersection else 1
+        events = heapq.merge(
+            *(
+                ((minute, 1 if i % 2 == 0 else -1) for i, minute in enumerate(schedule.bounds))
+                for schedule in schedules
+            )
+        )
+        bounds = array("q")
+        depth = 0
+        for minute, group in groupby(events, key=itemgetter(0)):
+            depth += sum(delta for _, delta in group)
+            # Boundaries alternate, so the state flips on every append
+            if (depth >= required) != (len(bounds) % 2 == 1):
+                bounds.append(minute)
+        return cls(
+            bounds,
+            max(schedule.valid_from for schedule in schedules),
+            min(schedule.valid_until for schedule in schedules),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of low tariff intervals."""
+        return len(self.bounds) // 2
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two schedules."""
+        if not isinstance(other, HdoSchedule):
+            return NotImplemented
+        return (
+            self.bounds == other.bounds
+            and self.valid_from == other.valid_from
+            and self.valid_until == other.valid_until
+        )
+
+    def covers(self, moment: datetime) -> bool:
+        """Return True if the schedule has data for the given moment."""
+        return self.valid_from <= to_minute(moment) < self.valid_until
+
+    def state_at(self, moment: datetime) -> bool:
+        """Return True if low tariff is active at the given moment."""
+        return bisect_right(self.bounds, to_minute(moment)) % 2 == 1
+
+    def next_transition(self, moment: datetime) -> datetime | None:
+        """Return the first switch strictly after the given moment."""
+        index = bisect_right(self.bounds, to_minute(moment))
+        if index < len(self.bounds):
+            return from_minute(self.bounds[index])
+        return None
+
+    def low_minutes(self, start: int, end: int) -> int:
+        """Return the low tariff minutes in [start, end) in epoch minutes.
+
+        Uses prefix sums over the intervals, so any range costs two bisects.
+        """
+        if end <= start:
+            return 0
+        return self._low_minutes_before(end) - self._low_minutes_before(start)
+
+    def _low_minutes_before(self, minute: int) -> int:
+        """Return the low tariff minutes before the given epoch minute."""
+        cumulative = self._cumulative
+        if cumulative is None:
+            # cumulative[i] is the low tariff total before interval i
+            bounds = self.bounds
+            cumulative = self._cumulative = array("q", [0])
+            for i in range(0, len(bounds), 2):
+                cumulative.append(cumulative[-1] + bounds[i + 1] - bounds[i])
+
+        index = bisect_right(self.bounds, minute)
+        total = cumulative[index // 2]
+        if index % 2:
+            # Inside an interval, add its elapsed part
+            total += minute - self.bounds[index - 1]
+        return total
+
+    def intervals(self) -> list[tuple[datetime, datetime]]:
+        """Return all low tariff intervals as aware datetimes."""
+        bounds = self.bounds
+        return [
+            (from_minute(bounds[i]), from_minute(bounds[i + 1]))
+            for i in range(0, len(bounds), 2)
+        ]
+
+    def switches_on(self, day: date) -> list[dict[str, Any]]:
+        """Return the switches of one local day in the legacy dict format."""
+        day_start = to_minute(datetime.combine(day, time(0, 0), CEZ_TZ))
+        day_end = to_minute(datetime.combine(day + timedelta(days=1), time(0, 0), CEZ_TZ))
+        bounds = self.bounds
+        switches: list[dict[str, Any]] = []
+
+        # Start from the interval containing (or following) midnight
+        index = bisect_right(bounds, day_start)
+        index -= index % 2
+        for i in range(index, len(bounds), 2):
+            if bounds[i] >= day_end:
+                break
+            switches.append({"time": from_minute(max(bounds[i], day_start)), "state": True})
+            switches.append({"time": from_minute(min(bounds[i + 1], day_end)), "state": False})
+        return switches
+
+    def overlapping(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Return the whole intervals overlapping [start, end) in epoch minutes."""
+        bounds = self.bounds
+        index = bisect_right(bounds, start)
+        index -= index % 2
+        # An interval ending exactly at start does not overlap
+        if index < len(bounds) and bounds[index + 1] <= start:
+            index += 2
+        last = bisect_right(bounds, end - 1)
+        last += last % 2
+        return [(bounds[i], bounds[i + 1]) for i in range(index, last, 2)]
+
+    def windows(self, start: int, end: int, min_length: int) -> list[tuple[int, int]]:
+        """Return contiguous low tariff windows of at least min_length minutes.
+
+        Windows are clipped to [start, end) and ordered by start.
+        """
+        clipped = self.clip(start, end)
+        return [
+            (clipped[i], clipped[i + 1])
+            for i in range(0, len(clipped), 2)
+            if clipped[i + 1] - clipped[i] >= min_length
+        ]
+
+    def clip(self, start: int, end: int) -> array:
+        """Return the boundaries clipped to [start, end) in epoch minutes."""
+        bounds = self.bounds
+        index = bisect_right(bounds, start)
+        index -= index % 2
+        clipped = array("q")
+        for i in range(index, len(bounds), 2):
+            if bounds[i] >= end:
+                break
+            if bounds[i + 1] <= start:
+                continue
+            clipped.append(max(bounds[i], start))
+            clipped.append(min(bounds[i + 1], end))
+        return clipped
+
+    def differs_from(self, other: HdoSchedule) -> bool:
+        """Return True if the schedules disagree where both have data.
+
+        Days added or dropped at either end do not count as a change.
+        """
+        start = max(self.valid_from, other.valid_from)
+        end = min(self.valid_until, other.valid_until)
+        return start < end and self.clip(start, end) != other.clip(start, end)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "bounds": self.bounds.tolist(),
+            "valid_from": self.valid_from,
+            "valid_until": self.valid_until,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> HdoSchedule:
+        """Restore a schedule serialized with as_dict."""
+        return cls(array("q", data["bounds"]), data["valid_from"], data["valid_until"])
+
+
+def parse_casy(casy: str, day: date) -> list[tuple[int, int]]:
+    """Parse a casy string such as "00:00-05:35; 06:30-08:55" for one day."""
+    intervals: list[tuple[int, int]] = []
+    day_start = datetime.combine(day, time(0, 0), CEZ_TZ)
+
+    for time_range in (r.strip() for r in casy.split(";")):
+        if "-" not in time_range:
+            continue
+
+        try:
+            start_str, end_str = (part.strip() for part in time_range.split("-", 1))
+            start_hour, start_min = map(int, start_str.split(":"))
+            end_hour, end_min = map(int, end_str.split(":"))
+        except (ValueError, TypeError) as err:
+            _LOGGER.warning("Could not parse time range '%s': %s", time_range, err)
+            continue
+
+        # Wall clock arithmetic, 24:00 being the next day's midnight
+        start = day_start + timedelta(hours=start_hour, minutes=start_min)
+        end = day_start + timedelta(hours=end_hour, minutes=end_min)
+        if end <= start:
+            # Range running over midnight, e.g. "22:00-06:00"
+            end += timedelta(days=1)
+        intervals.append((to_minute(start), to_minute(end)))
+
+    return intervals
+
+
+def signal_fingerprint(
+    signals_data: list[dict[str, Any]], signal: str, extra_signals: Collection[str] = ()
+) -> str:
+    """Return a hash of the dates and casy strings of one or more signals.
+
+    Whitespace and entry order are normalized, so only a real change of the
+    schedule changes the fingerprint.
+    """
+    signals = {signal, *extra_signals}
+    entries = sorted(
+        f"{entry.get('signal')}/{entry.get('datum')}={''.join((entry.get('casy') or '').split())}"
+        for entry in signals_data
+        if entry.get("signal") in signals
+    )
+    return hashlib.blake2b("|".join(entries).encode(), digest_size=8).hexdigest()
+
+
+def parse_signals(signals_data: list[dict[str, Any]], signal: str) -> HdoSchedule | None:
+    """Build a schedule from every date of one signal in data.signals[]."""
+    intervals: list[tuple[int, int]] = []
+    days: list[date] = []
+
+    for signal_entry in signals_data:
+        if signal_entry.get("signal") != signal:
+            continue
+        try:
+            day = datetime.strptime(signal_entry.get("datum", ""), DATE_FORMAT).date()
+        except (TypeError, ValueError):
+            _LOGGER.warning("Could not parse date '%s'", signal_entry.get("datum"))
+            continue
+        days.append(day)
+        intervals.extend(parse_casy(signal_entry.get("casy") or "", day))
+
+    if not days:
+        return None
+
+    return HdoSchedule.from_intervals(
+        intervals,
+        to_minute(datetime.combine(min(days), time(0, 0), CEZ_TZ)),
+        to_minute(datetime.combine(max(days) + timedelta(days=1), time(0, 0), CEZ_TZ)),
+    )
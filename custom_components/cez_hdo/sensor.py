@@ -0,0 +1,323 @@
+"""Sensor platform for CEZ HDO integration."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, time
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfEnergy, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import CezHdoCoordinator
+from .energy import PERIOD_MONTH
+from .schedule import CEZ_TZ
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _fetch_latency(coordinator: CezHdoCoordinator) -> float | None:
+    """Return the latency of the last upstream request in ms."""
+    fetch = coordinator.hub.fetch_metrics.get(coordinator.ean)
+    if fetch is None or fetch.latency.last is None:
+        return None
+    return round(fetch.latency.last * 1000, 1)
+
+
+def _parse_duration(coordinator: CezHdoCoordinator) -> float | None:
+    """Return the duration of the last parse in ms."""
+    last = coordinator.metrics.parse.last
+    return round(last * 1000, 3) if last is not None else None
+
+
+def _cache_hit_ratio(coordinator: CezHdoCoordinator) -> float | None:
+    """Return the share of requests answered from the cache in percent."""
+    ratio = coordinator.metrics.cache_hit_ratio
+    return round(ratio * 100, 1) if ratio is not None else None
+
+
+def _state_write_latency(coordinator: CezHdoCoordinator) -> float | None:
+    """Return how long the last response took to reach the entity states in ms."""
+    last = coordinator.metrics.state_write.last
+    return round(last * 1000, 3) if last is not None else None
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up CEZ HDO sensors based on a config entry."""
+    coordinator: CezHdoCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # Values derived from the schedule
+    async_add_entities([
+        CezHdoTimelineSensor(
+            coordinator,
+            "minutes_to_switch",
+            "Minutes To Switch",
+            UnitOfTime.MINUTES,
+            SensorDeviceClass.DURATION,
+            "mdi:timer-sand",
+            minute_tick=True,
+        ),
+        CezHdoTimelineSensor(
+            coordinator,
+            "low_minutes_remaining_today",
+            "Low Tariff Remaining Today",
+            UnitOfTime.MINUTES,
+            SensorDeviceClass.DURATION,
+            "mdi:clock-end",
+            minute_tick=True,
+        ),
+        CezHdoTimelineSensor(
+            coordinator,
+            "low_minutes_next_24h",
+            "Low Tariff Next 24h",
+            UnitOfTime.MINUTES,
+            SensorDeviceClass.DURATION,
+            "mdi:clock-outline",
+            minute_tick=True,
+        ),
+        CezHdoTimelineSensor(
+            coordinator,
+            "current_period_end",
+            "Current Period End",
+            None,
+            SensorDeviceClass.TIMESTAMP,
+            "mdi:clock-check",
+            minute_tick=False,
+        ),
+    ])
+
+    # Diagnostic sensors, disabled by default
+    async_add_entities([
+        CezHdoMetricSensor(
+            coordinator, "fetch_latency", "Fetch Latency", UnitOfTime.MILLISECONDS, _fetch_latency
+        ),
+        CezHdoMetricSensor(
+            coordinator, "parse_duration", "Parse Duration", UnitOfTime.MILLISECONDS, _parse_duration
+        ),
+        CezHdoMetricSensor(
+            coordinator, "cache_hit_ratio", "Cache Hit Ratio", PERCENTAGE, _cache_hit_ratio
+        ),
+        CezHdoMetricSensor(
+            coordinator,
+            "state_write_latency",
+            "State Write Latency",
+            UnitOfTime.MILLISECONDS,
+            _state_write_latency,
+        ),
+    ])
+
+    # Energy of this month split by tariff, from the long-term statistics
+    if coordinator.energy_statistic:
+        async_setup_energy_sensors(hass, config_entry, coordinator, async_add_entities)
+
+
+@callback
+def async_setup_energy_sensors(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: CezHdoCoordinator,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the sensors of this month's low and normal tariff energy.
+
+    Both are updated together with one split of the statistic, shortly
+    after the recorder compiled the statistics of the past hour.
+    """
+    sensors = [
+        CezHdoEnergySensor(coordinator, "low", "Low Tariff Energy This Month"),
+        CezHdoEnergySensor(coordinator, "normal", "Normal Tariff Energy This Month"),
+    ]
+
+    async def _async_update() -> None:
+        now = coordinator.clock.now()
+        month_start = datetime.combine(
+            now.astimezone(CEZ_TZ).date().replace(day=1), time(0, 0), CEZ_TZ
+        )
+        try:
+            split = await coordinator.async_split_energy(
+                coordinator.energy_statistic, month_start, now, PERIOD_MONTH
+            )
+        except HomeAssistantError as err:
+            _LOGGER.debug("Could not split %s by tariff: %s", coordinator.energy_statistic, err)
+            return
+        for sensor in sensors:
+            sensor.async_set_split(split, month_start)
+
+    @callback
+    def _handle_hour(_now: datetime) -> None:
+        config_entry.async_create_background_task(
+            hass, _async_update(), f"{DOMAIN}_energy_{coordinator.ean}_{coordinator.signal}"
+        )
+
+    async_add_entities(sensors)
+    # The statistics are not waited for, the sensors are unknown until split
+    _handle_hour(coordinator.clock.now())
+    config_entry.async_on_unload(
+        coordinator.clock.async_track_time_change(hass, _handle_hour, minute=5, second=0)
+    )
+
+
+class CezHdoTimelineSensor(CoordinatorEntity[CezHdoCoordinator], SensorEntity):
+    """Representation of a value derived from the CEZ HDO schedule.
+
+    Minute resolution sensors are ticked by the coordinator's shared minute
+    timer; the others only change when the coordinator pushes new data.
+    """
+
+    def __init__(
+        self,
+        coordinator: CezHdoCoordinator,
+        key: str,
+        name: str,
+        unit: str | None,
+        device_class: SensorDeviceClass,
+        icon: str,
+        minute_tick: bool,
+    ) -> None:
+        """Initialize the timeline sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"cez_hdo_{key}_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO {name} {coordinator.ean} {coordinator.signal}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_icon = icon
+        self._key = key
+        self._minute_tick = minute_tick
+
+        # Device info - same device as the binary sensors
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.ean)},
+            "name": f"CEZ HDO {coordinator.ean}",
+            "manufacturer": "ČEZ Distribuce",
+            "model": "HDO Signal",
+            "entry_type": "service",
+            "suggested_area": "Utility",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Register the minute tick when needed."""
+        await super().async_added_to_hass()
+        self._attr_native_value = self.coordinator.timeline_values().get(self._key)
+        if self._minute_tick:
+            self.async_on_remove(
+                self.coordinator.async_add_minute_listener(self._handle_minute)
+            )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._attr_native_value = self.coordinator.timeline_values().get(self._key)
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_minute(self) -> None:
+        """Write the state only if the value changed this minute."""
+        value = self.coordinator.timeline_values().get(self._key)
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+
+class CezHdoMetricSensor(CoordinatorEntity[CezHdoCoordinator], SensorEntity):
+    """Representation of a CEZ HDO diagnostic metric."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-line"
+
+    def __init__(
+        self,
+        coordinator: CezHdoCoordinator,
+        key: str,
+        name: str,
+        unit: str,
+        value_fn: Callable[[CezHdoCoordinator], Any],
+    ) -> None:
+        """Initialize the metric sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"cez_hdo_{key}_{coordinator.ean}_{coordinator.signal}"
+        self._attr_name = f"CEZ HDO {name} {coordinator.ean} {coordinator.signal}"
+        self._attr_native_unit_of_measurement = unit
+        self._value_fn = value_fn
+
+        # Device info - same device as the binary sensors
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.ean)},
+            "name": f"CEZ HDO {coordinator.ean}",
+            "manufacturer": "ČEZ Distribuce",
+            "model": "HDO Signal",
+            "entry_type": "service",
+            "suggested_area": "Utility",
+        }
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current metric value."""
+        return self._value_fn(self.coordinator)
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return True
+
+
+class CezHdoEnergySensor(SensorEntity):
+    """Representation of the energy used in one tariff this month.
+
+    Energy outside the known schedule is in neither tariff, it is reported
+    in the uncovered attribute.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_suggested_display_precision = 2
+    _attr_icon = "mdi:lightning-bolt"
+
+    def __init__(self, coordinator: CezHdoCoordinator, tariff: str, name: str) -> None:
+        """Initialize the energy sensor."""
+        self._attr_unique_id = (
+            f"cez_hdo_{tariff}_energy_month_{coordinator.ean}_{coordinator.signal}"
+        )
+        self._attr_name = f"CEZ HDO {name} {coordinator.ean} {coordinator.signal}"
+        self._tariff = tariff
+
+        # Device info - same device as the binary sensors
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.ean)},
+            "name": f"CEZ HDO {coordinator.ean}",
+            "manufacturer": "ČEZ Distribuce",
+            "model": "HDO Signal",
+            "entry_type": "service",
+            "suggested_area": "Utility",
+        }
+
+    @callback
+    def async_set_split(self, split: dict[str, Any], month_start: datetime) -> None:
+        """Take over the split of this month's energy."""
+        self._attr_native_value = split[self._tariff]
+        self._attr_last_reset = month_start
+        self._attr_extra_state_attributes = {
+            "statistic_id": split["statistic_id"],
+            "uncovered": split["uncovered"],
+        }
+        if self.hass is not None:
+            self.async_write_ha_state()
@@ -0,0 +1,231 @@
+"""Services for CEZ HDO integration."""
+from __future__ import annotations
+
+import logging
+import math
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_FINISH_BY,
+    ATTR_HORIZON,
+    ATTR_MODE,
+    ATTR_PERIOD,
+    ATTR_RESOLUTION,
+    ATTR_START,
+    ATTR_STATISTIC_ID,
+    CONF_EAN,
+    CONF_SIGNAL,
+    DOMAIN,
+    SERVICE_FIND_WINDOW,
+    SERVICE_LOW_INTERVALS,
+    SERVICE_SPLIT_ENERGY,
+    WINDOW_MODE_ALL,
+    WINDOW_MODE_EARLIEST,
+    WINDOW_MODE_LONGEST,
+)
+from .coordinator import CezHdoCoordinator
+from .energy import PERIOD_DAY, PERIOD_MONTH
+from .schedule import from_minute, to_minute
+
+_LOGGER = logging.getLogger(__name__)
+
+FIND_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_EAN): cv.string,
+        vol.Optional(CONF_SIGNAL): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(
+            cv.positive_time_period,
+            vol.Range(min=timedelta(seconds=1), msg="duration must be longer than zero"),
+        ),
+        vol.Optional(ATTR_HORIZON, default=timedelta(hours=24)): cv.positive_time_period,
+        vol.Optional(ATTR_FINISH_BY): cv.datetime,
+        vol.Optional(ATTR_MODE, default=WINDOW_MODE_EARLIEST): vol.In(
+            [WINDOW_MODE_EARLIEST, WINDOW_MODE_LONGEST, WINDOW_MODE_ALL]
+        ),
+    }
+)
+
+SPLIT_ENERGY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_EAN): cv.string,
+        vol.Optional(CONF_SIGNAL): cv.string,
+        vol.Optional(ATTR_STATISTIC_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_PERIOD, default=PERIOD_DAY): vol.In([PERIOD_DAY, PERIOD_MONTH]),
+        vol.Optional(ATTR_RESOLUTION, default="hour"): vol.In(["hour", "5minute"]),
+    }
+)
+
+LOW_INTERVALS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_EAN): cv.string,
+        vol.Optional(CONF_SIGNAL): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+
+def _as_aware(moment: datetime) -> datetime:
+    """Return moment in the local time zone if it has none."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return moment
+
+
+def get_coordinator(hass: HomeAssistant, call: ServiceCall) -> CezHdoCoordinator:
+    """Return the coordinator selected by the ean and signal of a call."""
+    ean = call.data.get(CONF_EAN)
+    signal = call.data.get(CONF_SIGNAL)
+    coordinators = [
+        coordinator
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+        if (ean is None or coordinator.ean == ean)
+        and (signal is None or coordinator.signal == signal)
+    ]
+    if not coordinators:
+        raise HomeAssistantError(f"No CEZ HDO entry found for EAN {ean} and signal {signal}")
+    if len(coordinators) > 1:
+        raise HomeAssistantError("Several CEZ HDO entries match, specify ean and signal")
+    return coordinators[0]
+
+
+async def async_find_window(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Find low tariff windows long enough for a given duration.
+
+    Answered from the in-memory schedule with interval arithmetic, no
+    request is sent to CEZ.
+    """
+    coordinator = get_coordinator(hass, call)
+    schedule = (coordinator.data or {}).get("schedule")
+    if schedule is None or coordinator.data.get("error_mode"):
+        raise HomeAssistantError("No HDO schedule available")
+
+    # A started minute of the run needs a whole minute of low tariff
+    duration = math.ceil(call.data[ATTR_DURATION].total_seconds() / 60)
+    start = to_minute(coordinator.clock.now())
+    # A started minute of the horizon is dropped, so windows never end past it
+    end = start + int(call.data[ATTR_HORIZON].total_seconds() // 60)
+    if finish_by := call.data.get(ATTR_FINISH_BY):
+        end = min(end, to_minute(_as_aware(finish_by)))
+
+    windows = schedule.windows(start, end, duration)
+    mode = call.data[ATTR_MODE]
+    if mode == WINDOW_MODE_EARLIEST:
+        windows = windows[:1]
+    elif mode == WINDOW_MODE_LONGEST and windows:
+        windows = [max(windows, key=lambda window: window[1] - window[0])]
+
+    return {
+        "windows": [
+            {
+                "start": from_minute(window_start, dt_util.DEFAULT_TIME_ZONE).isoformat(),
+                "end": from_minute(window_end, dt_util.DEFAULT_TIME_ZONE).isoformat(),
+                "minutes": window_end - window_start,
+            }
+            for window_start, window_end in windows
+        ],
+        "schedule_covers_until": from_minute(
+            schedule.valid_until, dt_util.DEFAULT_TIME_ZONE
+        ).isoformat(),
+    }
+
+
+async def async_split_energy(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Split an energy statistic into low and normal tariff per day or month.
+
+    The statistic defaults to the energy sensor set in the entry's options.
+    """
+    coordinator = get_coordinator(hass, call)
+    statistic_id = call.data.get(ATTR_STATISTIC_ID) or coordinator.energy_statistic
+    if statistic_id is None:
+        raise HomeAssistantError("No energy statistic given or configured")
+
+    start = _as_aware(call.data[ATTR_START])
+    end = _as_aware(call.data.get(ATTR_END) or coordinator.clock.now())
+    if end <= start:
+        raise HomeAssistantError("The end must be after the start")
+
+    return await coordinator.async_split_energy(
+        statistic_id, start, end, call.data[ATTR_PERIOD], call.data[ATTR_RESOLUTION]
+    )
+
+
+async def async_low_intervals(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the low tariff intervals between two moments.
+
+    Past days are read from the schedule archive, the rest from the cached
+    schedule. Periods without a known schedule are missing from covered.
+    """
+    coordinator = get_coordinator(hass, call)
+    start = _as_aware(call.data[ATTR_START])
+    end = _as_aware(call.data.get(ATTR_END) or coordinator.clock.now())
+    if end <= start:
+        raise HomeAssistantError("The end must be after the start")
+
+    low, covered = await coordinator.async_tariff_bounds(to_minute(start), to_minute(end))
+
+    def _spans(bounds: Sequence[int]) -> list[dict[str, Any]]:
+        return [
+            {
+                "start": from_minute(bounds[i], dt_util.DEFAULT_TIME_ZONE).isoformat(),
+                "end": from_minute(bounds[i + 1], dt_util.DEFAULT_TIME_ZONE).isoformat(),
+                "minutes": bounds[i + 1] - bounds[i],
+            }
+            for i in range(0, len(bounds), 2)
+        ]
+
+    intervals = _spans(low)
+    known = _spans(covered)
+    return {
+        "intervals": intervals,
+        "covered": known,
+        "low_minutes": sum(span["minutes"] for span in intervals),
+        "covered_minutes": sum(span["minutes"] for span in known),
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the CEZ HDO services."""
+
+    async def _async_find_window(call: ServiceCall) -> ServiceResponse:
+        return await async_find_window(hass, call)
+
+    async def _async_split_energy(call: ServiceCall) -> ServiceResponse:
+        return await async_split_energy(hass, call)
+
+    async def _async_low_intervals(call: ServiceCall) -> ServiceResponse:
+        return await async_low_intervals(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_WINDOW,
+        _async_find_window,
+        schema=FIND_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SPLIT_ENERGY,
+        _async_split_energy,
+        schema=SPLIT_ENERGY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LOW_INTERVALS,
+        _async_low_intervals,
+        schema=LOW_INTERVALS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,105 @@
+"""Backoff, circuit breaker and request budget for CEZ HDO."""
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """Token bucket limiting the upstream request rate.
+
+    One bucket is shared by every config entry, so the total number of
+    requests stays bounded however many entries are configured.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a full bucket gaining one token per refill_interval."""
+        self.capacity = capacity
+        self.refill_interval = refill_interval
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) / self.refill_interval
+        )
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Return the seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) * self.refill_interval)
+
+    @property
+    def tokens(self) -> float:
+        """Return the tokens currently available."""
+        self._refill()
+        return self._tokens
+
+
+class Backoff:
+    """Exponential backoff with jitter and a circuit breaker for one EAN.
+
+    Every failure defers the next attempt by an exponentially growing,
+    jittered delay; attempts before that are rejected without touching the
+    network. After a number of consecutive failures the circuit opens and
+    the delay stays at its maximum until a probe succeeds.
+    """
+
+    def __init__(
+        self,
+        base_delay: float,
+        max_delay: float,
+        failure_threshold: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the backoff."""
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self._clock = clock
+        self.failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the circuit breaker is open."""
+        return self.failures >= self.failure_threshold
+
+    def retry_in(self) -> float:
+        """Return the seconds until the next attempt is allowed."""
+        return max(0.0, self._retry_at - self._clock())
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the delay."""
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def record_failure(self) -> float:
+        """Defer the next attempt and return the delay in seconds."""
+        self.failures += 1
+        if self.is_open:
+            delay = self.max_delay
+        else:
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        # Equal jitter: at least half the delay, so retries stay spread out
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        self._retry_at = self._clock() + delay
+        return delay
@@ -0,0 +1,43 @@
+"""Fixtures for CEZ HDO tests.
+
+Tests of the integration need pytest-homeassistant-custom-component and
+are not collected without it. The modules that do not need Home Assistant,
+such as the schedule, throttle, energy and archive modules, are tested
+either way.
+"""
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# Tests that set up the integration in a Home Assistant test instance
+HOMEASSISTANT_TESTS = ["test_coordinator.py", "test_init.py"]
+
+try:
+    import pytest_homeassistant_custom_component  # noqa: F401
+except ImportError:
+    collect_ignore = HOMEASSISTANT_TESTS
+    HAS_HOMEASSISTANT = False
+else:
+    pytest_plugins = ["pytest_homeassistant_custom_component"]
+    HAS_HOMEASSISTANT = True
+
+try:
+    import homeassistant  # noqa: F401
+except ImportError:
+    # The package __init__ imports Home Assistant, register the package
+    # without running it so that its plain Python modules can be imported
+    _package = types.ModuleType("custom_components.cez_hdo")
+    _package.__path__ = [str(Path(__file__).parents[1] / "custom_components" / "cez_hdo")]
+    sys.modules.setdefault("custom_components.cez_hdo", _package)
+
+
+if HAS_HOMEASSISTANT:
+
+    @pytest.fixture(autouse=True)
+    def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+        """Load the integration from custom_components."""
+        return
@@ -0,0 +1,70 @@
+"""Tests for the CEZ HDO API client."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from custom_components.cez_hdo.api import SignalStreamFilter  # noqa: E402
+
+RESPONSE = {
+    "data": {
+        "signals": [
+            {"signal": "a3b4dp01", "den": "Pondělí", "datum": "12.01.2026", "casy": "00:00-06:00"},
+            {"signal": "a3b4dp02", "den": "Pondělí", "datum": "12.01.2026", "casy": "01:00-07:00"},
+            {"signal": "a3b4dp01", "den": "Úterý", "datum": "13.01.2026", "casy": "22:00-24:00"},
+        ],
+        "partner": "ČEZ Distribuce, a. s.",
+    },
+    "statusCode": 200,
+}
+
+
+def _filter(body: bytes, signals: set[str], chunk_size: int) -> dict:
+    """Feed body in chunks of chunk_size bytes and return the result."""
+    stream = SignalStreamFilter(signals)
+    for start in range(0, len(body), chunk_size):
+        stream.feed(body[start:start + chunk_size])
+    assert stream.bytes_received == len(body)
+    return stream.result()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 4096])
+def test_stream_keeps_selected_signals(chunk_size: int) -> None:
+    """Entries split anywhere, also inside UTF-8 characters, are decoded."""
+    body = json.dumps(RESPONSE, ensure_ascii=False, indent=1).encode()
+    assert _filter(body, {"a3b4dp01"}, chunk_size) == {
+        "data": {
+            "signals": [
+                entry for entry in RESPONSE["data"]["signals"] if entry["signal"] == "a3b4dp01"
+            ]
+        }
+    }
+
+
+def test_stream_every_split() -> None:
+    """A body split in two at any byte gives the same entries."""
+    body = json.dumps(RESPONSE, ensure_ascii=False).encode()
+    expected = {"data": {"signals": RESPONSE["data"]["signals"]}}
+    for split in range(len(body) + 1):
+        stream = SignalStreamFilter({"a3b4dp01", "a3b4dp02"})
+        stream.feed(body[:split])
+        stream.feed(body[split:])
+        assert stream.result() == expected
+
+
+def test_stream_without_signals() -> None:
+    """A response without the signals array gives no entries."""
+    body = json.dumps({"data": {"message": "EAN not found"}}).encode()
+    assert _filter(body, {"a3b4dp01"}, 5) == {"data": {"signals": []}}
+
+
+def test_stream_truncated_body() -> None:
+    """A body cut inside an entry is an error, not a shorter schedule."""
+    body = json.dumps(RESPONSE).encode()
+    stream = SignalStreamFilter({"a3b4dp01"})
+    stream.feed(body[: body.index(b"a3b4dp02")])
+    with pytest.raises(json.JSONDecodeError):
+        stream.result()
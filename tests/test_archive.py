@@ -0,0 +1,126 @@
+"""Tests for the CEZ HDO schedule archive."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from custom_components.cez_hdo.archive import (
+    MAGIC,
+    RECORD_SIZE,
+    ArchiveFormatError,
+    IntervalFile,
+    ScheduleArchive,
+)
+from custom_components.cez_hdo.schedule import HdoSchedule
+
+DAY = 29_000_160
+
+
+def _schedule(days: int = 3) -> HdoSchedule:
+    """Return days of three low tariff intervals, the last one into the next day."""
+    intervals = []
+    for day in range(days):
+        start = DAY + day * 1440
+        intervals += [(start + 30, start + 150), (start + 600, start + 700)]
+        intervals.append((start + 1380, start + 1500))
+    return HdoSchedule.from_intervals(intervals, DAY, DAY + days * 1440)
+
+
+def _records(file: IntervalFile) -> int:
+    """Return the number of records in an interval file."""
+    return (file.path.stat().st_size - len(MAGIC)) // RECORD_SIZE
+
+
+def test_interval_file_query(tmp_path: Path) -> None:
+    """Queries clip to the range and merge intervals that touch."""
+    file = IntervalFile(tmp_path / "test.low")
+    assert list(file.query(0, 100)) == []
+    assert file.last_end() is None
+
+    file.append([10, 20, 30, 40])
+    file.append([50, 60])
+    assert file.last_end() == 60
+    assert list(file.query(15, 55)) == [15, 20, 30, 40, 50, 55]
+    assert list(file.query(40, 50)) == []
+    assert list(file.query(0, 100)) == [10, 20, 30, 40, 50, 60]
+
+
+def test_interval_file_extends_last_record(tmp_path: Path) -> None:
+    """An interval starting at the last end extends the last record."""
+    file = IntervalFile(tmp_path / "test.covered")
+    file.append([0, 60])
+    file.append([60, 120])
+    file.append([120, 130, 200, 210])
+    assert _records(file) == 2
+    assert list(file.query(0, 300)) == [0, 130, 200, 210]
+
+
+def test_interval_file_foreign_header(tmp_path: Path) -> None:
+    """A file with another header is not read as intervals."""
+    path = tmp_path / "test.low"
+    path.write_bytes(b"NOTANARCHIVE" + bytes(2 * RECORD_SIZE))
+    with pytest.raises(ArchiveFormatError):
+        IntervalFile(path).query(0, 100)
+
+
+def test_interval_file_truncate_after(tmp_path: Path) -> None:
+    """Intervals past a minute are dropped, one across it is cut there."""
+    file = IntervalFile(tmp_path / "test.low")
+    file.append([10, 20, 30, 50, 60, 70])
+    file.truncate_after(40)
+    assert list(file.query(0, 100)) == [10, 20, 30, 40]
+
+
+def test_archive_hourly_appends(tmp_path: Path) -> None:
+    """Hourly appends store every interval once, in as few records as possible."""
+    schedule = _schedule()
+    archive = ScheduleArchive(tmp_path, "ean", "signal")
+    for hour in range(1, 3 * 24 + 1):
+        archive.append(schedule, DAY + hour * 60)
+
+    assert archive.archived_until == DAY + 3 * 1440
+    low, covered = archive.query(DAY - 1440, DAY + 5 * 1440)
+    assert list(low) == list(schedule.clip(DAY, DAY + 3 * 1440))
+    assert list(covered) == [DAY, DAY + 3 * 1440]
+    assert _records(archive._covered) == 1
+    assert _records(archive._low) == len(schedule)
+
+
+def test_archive_nothing_new(tmp_path: Path) -> None:
+    """Appending the archived part again writes nothing."""
+    schedule = _schedule()
+    archive = ScheduleArchive(tmp_path, "ean", "signal")
+    assert archive.append(schedule, DAY + 600)
+    assert not archive.append(schedule, DAY + 600)
+    assert not archive.append(schedule, DAY + 300)
+
+
+def test_archive_repairs_interrupted_append(tmp_path: Path) -> None:
+    """Low intervals written without their span are cut back on load."""
+    schedule = _schedule()
+    archive = ScheduleArchive(tmp_path, "ean", "signal")
+    archive.append(schedule, DAY + 60)
+    # A crash after extending the low intervals, before the span
+    archive._low.append(schedule.clip(DAY + 60, DAY + 120))
+
+    reopened = ScheduleArchive(tmp_path, "ean", "signal")
+    assert reopened.archived_until == DAY + 60
+    low, covered = reopened.query(DAY, DAY + 1440)
+    assert list(low) == [DAY + 30, DAY + 60]
+    assert list(covered) == [DAY, DAY + 60]
+
+
+def test_archive_moves_foreign_files_aside(tmp_path: Path) -> None:
+    """A foreign file starts a new archive instead of being read."""
+    (tmp_path / "ean_signal.low").write_bytes(b"garbage!" + bytes(RECORD_SIZE))
+    (tmp_path / "ean_signal.covered").write_bytes(MAGIC + bytes(RECORD_SIZE))
+
+    archive = ScheduleArchive(tmp_path, "ean", "signal")
+    assert archive.archived_until is None
+    assert (tmp_path / "ean_signal.low.corrupt").exists()
+    assert (tmp_path / "ean_signal.covered.corrupt").exists()
+
+    schedule = _schedule(1)
+    assert archive.append(schedule, DAY + 1440)
+    assert list(archive.query(DAY, DAY + 1440)[0]) == list(schedule.clip(DAY, DAY + 1440))
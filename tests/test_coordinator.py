@@ -0,0 +1,63 @@
+"""Tests for the CEZ HDO coordinator."""
+from __future__ import annotations
+
+from datetime import datetime, time
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.cez_hdo.const import CONF_EAN, CONF_SIGNAL, EVENT_SCHEDULE_CHANGED
+from custom_components.cez_hdo.coordinator import CezHdoCoordinator
+from custom_components.cez_hdo.schedule import CEZ_TZ, HdoSchedule, to_minute
+
+EAN = "859182400600000000"
+SIGNAL = "a3b4dp01"
+
+
+def _schedule_data(low_start: int) -> dict[str, Any]:
+    """Return API data with one two hour low tariff interval today."""
+    today = dt_util.now().astimezone(CEZ_TZ).date()
+    day = to_minute(datetime.combine(today, time(0, 0), CEZ_TZ))
+    schedule = HdoSchedule.from_intervals(
+        [(day + low_start, day + low_start + 120)], day, day + 2 * 1440
+    )
+    return {
+        "schedule": schedule,
+        "schedule_last_update": None,
+        "fingerprint": f"fingerprint-{low_start}",
+    }
+
+
+async def test_schedule_change(hass: HomeAssistant) -> None:
+    """A changed schedule is served, saved and announced."""
+    coordinator = CezHdoCoordinator(hass, {CONF_EAN: EAN, CONF_SIGNAL: SIGNAL})
+    events = async_capture_events(hass, EVENT_SCHEDULE_CHANGED)
+    first, second = _schedule_data(60), _schedule_data(600)
+
+    with patch.object(
+        coordinator.api, "async_get_data", AsyncMock(side_effect=[first, second])
+    ), patch.object(coordinator._store, "async_delay_save") as save, patch.object(
+        coordinator.archive, "append"
+    ):
+        await coordinator.async_refresh()
+        assert not coordinator.data.get("error_mode")
+        assert coordinator.data["schedule"] == first["schedule"]
+        assert save.call_count == 1
+        assert not events
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert not coordinator.data.get("error_mode")
+    assert coordinator.data["schedule"] == second["schedule"]
+    assert save.call_count == 2
+    assert len(events) == 1
+    assert events[0].data == {
+        "ean": EAN,
+        "signal": SIGNAL,
+        "fingerprint": "fingerprint-600",
+    }
+    await coordinator.async_shutdown()
@@ -0,0 +1,92 @@
+"""Tests for splitting energy by CEZ HDO tariff."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+
+import pytest
+
+from custom_components.cez_hdo import energy
+from custom_components.cez_hdo.energy import (
+    PERIOD_DAY,
+    PERIOD_MONTH,
+    minutes_before,
+    period_starts,
+    split_energy,
+    totals_by_period,
+)
+from custom_components.cez_hdo.schedule import CEZ_TZ, to_minute
+
+
+@pytest.fixture(autouse=True, params=["numpy", "python"])
+def implementation(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run every test with NumPy, if installed, and with the fallback."""
+    if request.param == "numpy":
+        if energy.np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(energy, "np", None)
+
+
+def _floats(values) -> list[float]:
+    """Return a list or array as plain floats."""
+    return [float(value) for value in values]
+
+
+def test_minutes_before() -> None:
+    """Minutes inside the intervals before each minute, bisecting once each."""
+    bounds = [10, 20, 30, 40]
+    assert _floats(minutes_before(bounds, [0, 10, 15, 20, 25, 35, 40, 50])) == [
+        0, 0, 5, 10, 10, 15, 20, 20,
+    ]
+    assert _floats(minutes_before([], [0, 100])) == [0, 0]
+
+
+def test_split_energy() -> None:
+    """Energy is split by the share of each bucket in every tariff."""
+    low, normal, uncovered = split_energy(
+        [30, 45],
+        [0, 45],
+        [0, 60],
+        [60, 120],
+        [6.0, 2.0],
+    )
+    assert _floats(low) == pytest.approx([1.5, 0])
+    assert _floats(normal) == pytest.approx([3.0, 0])
+    assert _floats(uncovered) == pytest.approx([1.5, 2.0])
+
+
+def test_split_energy_adds_up() -> None:
+    """The three parts of every bucket add up to its energy."""
+    starts = list(range(0, 1440, 60))
+    ends = [start + 60 for start in starts]
+    values = [float(i % 5) for i in range(len(starts))]
+    low, normal, uncovered = split_energy(
+        [0, 130, 600, 615, 1300, 1500], [0, 1000, 1100, 1440], starts, ends, values
+    )
+    for i, value in enumerate(values):
+        assert float(low[i]) + float(normal[i]) + float(uncovered[i]) == pytest.approx(value)
+
+
+def test_period_starts() -> None:
+    """Days and months are listed across the end of a year."""
+    assert period_starts(date(2025, 12, 30), date(2026, 1, 2), PERIOD_DAY) == [
+        date(2025, 12, 30),
+        date(2025, 12, 31),
+        date(2026, 1, 1),
+        date(2026, 1, 2),
+    ]
+    assert period_starts(date(2025, 11, 15), date(2026, 1, 2), PERIOD_MONTH) == [
+        date(2025, 11, 1),
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+    ]
+
+
+def test_totals_by_period() -> None:
+    """Buckets count for the local day they start in, earlier ones not at all."""
+    periods = [date(2026, 1, 1), date(2026, 1, 2)]
+    first = to_minute(datetime.combine(periods[0], time(0, 0), CEZ_TZ))
+    starts = [first - 60, first, first + 23 * 60, first + 24 * 60]
+    low, normal = totals_by_period(starts, periods, [1, 2, 3, 4], [10, 20, 30, 40])
+    assert _floats(low) == [5, 4]
+    assert _floats(normal) == [50, 40]
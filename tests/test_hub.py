@@ -0,0 +1,60 @@
+"""Tests for the CEZ HDO fetch hub."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from custom_components.cez_hdo.api import CezHdoApiError  # noqa: E402
+from custom_components.cez_hdo.hub import CezHdoHub  # noqa: E402
+from custom_components.cez_hdo.metrics import FetchMetrics  # noqa: E402
+
+EAN = "123456789012345678"
+RESPONSE = {"data": {"signals": [{"signal": "a3b4dp01", "datum": "15.01.2026", "casy": ""}]}}
+
+
+class FakeHub(CezHdoHub):
+    """Hub answering upstream requests without a network."""
+
+    def __init__(self) -> None:
+        """Initialize the hub without a session."""
+        super().__init__(None)  # type: ignore[arg-type]
+        self.fail = False
+
+    async def _async_request(
+        self, ean: str, signals: frozenset[str] | None, metrics: FetchMetrics | None
+    ) -> dict[str, Any]:
+        """Return the canned response or fail."""
+        if self.fail:
+            raise CezHdoApiError("Simulated failure")
+        return RESPONSE
+
+
+def test_discover_keeps_nothing() -> None:
+    """A discovery fetch leaves no response, backoff or metrics behind."""
+    hub = FakeHub()
+    assert asyncio.run(hub.async_discover(EAN)) == RESPONSE
+    assert hub.upstream_requests == 1
+    assert not hub._responses
+    assert not hub._backoffs
+    assert not hub.fetch_metrics
+
+
+def test_unsubscribe_drops_ean_state() -> None:
+    """The last subscriber leaving drops everything kept for its EAN."""
+    hub = FakeHub()
+    received: list[dict[str, Any]] = []
+    unsubscribe = hub.subscribe(EAN, ["a3b4dp01"], received.append)
+
+    hub.fail = True
+    with pytest.raises(CezHdoApiError):
+        asyncio.run(hub.async_get(EAN, ["a3b4dp01"]))
+    assert hub.retry_in(EAN) > 0
+
+    unsubscribe()
+    assert not hub._backoffs
+    assert not hub.fetch_metrics
+    assert hub.retry_in(EAN) == 0
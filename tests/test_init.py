@@ -0,0 +1,49 @@
+"""Tests for setting up the CEZ HDO integration."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.cez_hdo import async_migrate_entry
+from custom_components.cez_hdo.const import CONF_EAN, CONF_SIGNAL, DATA_PUSH_VIEW, DOMAIN
+from custom_components.cez_hdo.push import CezHdoTimelineView, async_forget_timeline
+
+EAN = "859182400600000000"
+SIGNAL = "a3b4dp02"
+
+
+async def test_migrate_entry_to_signal_unique_ids(hass: HomeAssistant) -> None:
+    """An entry of one EAN becomes the entry of its signal, keeping entity IDs."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, version=1, unique_id=EAN, data={CONF_EAN: EAN, CONF_SIGNAL: SIGNAL}
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    entity = registry.async_get_or_create(
+        "binary_sensor", DOMAIN, f"cez_hdo_error_{EAN}", config_entry=entry
+    )
+
+    assert await async_migrate_entry(hass, entry)
+
+    assert entry.version == 2
+    assert entry.unique_id == f"{EAN}_{SIGNAL}"
+    assert (
+        registry.async_get_entity_id("binary_sensor", DOMAIN, f"cez_hdo_error_{EAN}_{SIGNAL}")
+        == entity.entity_id
+    )
+
+
+async def test_forget_timeline(hass: HomeAssistant) -> None:
+    """An unloaded entry leaves no timeline in the cache of the endpoint."""
+    view = CezHdoTimelineView(hass)
+    hass.data[DATA_PUSH_VIEW] = view
+    coordinator = SimpleNamespace(ean=EAN, signal=SIGNAL)
+    view._timelines[(EAN, SIGNAL)] = ("version", {})
+    view._timelines[(EAN, "a3b4dp01")] = ("version", {})
+
+    async_forget_timeline(hass, coordinator)
+
+    assert list(view._timelines) == [(EAN, "a3b4dp01")]
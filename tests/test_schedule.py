@@ -0,0 +1,191 @@
+"""Tests for the CEZ HDO schedule."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+
+from custom_components.cez_hdo.schedule import (
+    CEZ_TZ,
+    HdoSchedule,
+    parse_casy,
+    parse_signals,
+    to_minute,
+)
+
+SIGNAL = "a3b4dp01"
+
+
+def _minute(day: date, hour: int, minute: int = 0) -> int:
+    """Return a CEZ wall clock time in epoch minutes."""
+    return to_minute(datetime.combine(day, time(hour, minute), CEZ_TZ))
+
+
+def _entry(day: date, casy: str, signal: str = SIGNAL) -> dict[str, str]:
+    """Return one entry of data.signals[]."""
+    return {"signal": signal, "datum": day.strftime("%d.%m.%Y"), "casy": casy}
+
+
+def test_parse_casy() -> None:
+    """Ranges are parsed in local time, whitespace and bad ranges ignored."""
+    day = date(2026, 1, 15)
+    assert parse_casy(" 00:00-05:35;06:30 - 08:55;  ;bad-range", day) == [
+        (_minute(day, 0), _minute(day, 5, 35)),
+        (_minute(day, 6, 30), _minute(day, 8, 55)),
+    ]
+
+
+def test_parse_casy_midnight() -> None:
+    """24:00 and ranges over midnight end on the next day."""
+    day = date(2026, 1, 15)
+    next_day = date(2026, 1, 16)
+    assert parse_casy("20:00-24:00; 22:00-06:00", day) == [
+        (_minute(day, 20), _minute(next_day, 0)),
+        (_minute(day, 22), _minute(next_day, 6)),
+    ]
+
+
+def test_parse_casy_daylight_saving_time() -> None:
+    """Wall clock ranges are one hour shorter or longer on switch days."""
+    ((start, end),) = parse_casy("00:00-06:00", date(2026, 3, 29))
+    assert end - start == 5 * 60
+    ((start, end),) = parse_casy("00:00-06:00", date(2026, 10, 25))
+    assert end - start == 7 * 60
+
+
+def test_parse_signals_merges_dates() -> None:
+    """Every date of the signal ends up in one merged timeline."""
+    first, second = date(2026, 1, 15), date(2026, 1, 16)
+    schedule = parse_signals(
+        [
+            _entry(second, "00:00-02:00; 10:00-12:00"),
+            _entry(first, "22:00-24:00"),
+            _entry(first, "00:00-23:00", signal="a3b4dp02"),
+            {"signal": SIGNAL, "datum": "not a date", "casy": "00:00-24:00"},
+        ],
+        SIGNAL,
+    )
+    assert schedule is not None
+    assert list(schedule.bounds) == [
+        _minute(first, 22),
+        _minute(second, 2),
+        _minute(second, 10),
+        _minute(second, 12),
+    ]
+    assert schedule.valid_from == _minute(first, 0)
+    assert schedule.valid_until == _minute(date(2026, 1, 17), 0)
+
+
+def test_parse_signals_unknown_signal() -> None:
+    """No schedule is built for a signal missing from the response."""
+    assert parse_signals([_entry(date(2026, 1, 15), "00:00-02:00")], "a3b4dp06") is None
+
+
+def test_from_intervals_merges() -> None:
+    """Overlapping and adjacent intervals are merged, empty ones dropped."""
+    schedule = HdoSchedule.from_intervals(
+        [(50, 60), (0, 10), (10, 20), (15, 30), (40, 40)], 0, 100
+    )
+    assert list(schedule.bounds) == [0, 30, 50, 60]
+    assert len(schedule) == 2
+
+
+def _schedule() -> HdoSchedule:
+    """Return two days with low tariff 00:00-02:00, 10:00-12:00 and 22:00-06:00."""
+    day = date(2026, 1, 15)
+    return parse_signals(
+        [_entry(day, "00:00-02:00; 10:00-12:00; 22:00-06:00"), _entry(date(2026, 1, 16), "")],
+        SIGNAL,
+    )
+
+
+def test_state_at_matches_intervals() -> None:
+    """The bisect lookup agrees with the intervals at every minute."""
+    schedule = _schedule()
+    intervals = list(zip(schedule.bounds[::2], schedule.bounds[1::2]))
+    for minute in range(schedule.valid_from - 60, schedule.valid_until + 60, 7):
+        moment = datetime.fromtimestamp(minute * 60, CEZ_TZ)
+        expected = any(start <= minute < end for start, end in intervals)
+        assert schedule.state_at(moment) is expected
+
+
+def test_state_at_boundaries() -> None:
+    """A switch applies from its own minute."""
+    schedule = _schedule()
+    day = date(2026, 1, 15)
+    assert schedule.state_at(datetime.combine(day, time(10, 0), CEZ_TZ))
+    assert not schedule.state_at(datetime.combine(day, time(12, 0), CEZ_TZ))
+    assert schedule.state_at(datetime.combine(day, time(11, 59, 59), CEZ_TZ))
+
+
+def test_next_transition() -> None:
+    """The next switch is strictly after the moment, None after the last one."""
+    schedule = _schedule()
+    day = date(2026, 1, 15)
+    assert schedule.next_transition(datetime.combine(day, time(10, 0), CEZ_TZ)) == (
+        datetime.combine(day, time(12, 0), CEZ_TZ)
+    )
+    assert schedule.next_transition(datetime.combine(day, time(13, 0), CEZ_TZ)) == (
+        datetime.combine(day, time(22, 0), CEZ_TZ)
+    )
+    after_last = datetime.combine(date(2026, 1, 16), time(7, 0), CEZ_TZ)
+    assert schedule.next_transition(after_last) is None
+
+
+def test_covers() -> None:
+    """The schedule has data from the first midnight to the last one."""
+    schedule = _schedule()
+    assert schedule.covers(datetime.combine(date(2026, 1, 15), time(0, 0), CEZ_TZ))
+    assert schedule.covers(datetime.combine(date(2026, 1, 16), time(23, 59), CEZ_TZ))
+    assert not schedule.covers(datetime.combine(date(2026, 1, 17), time(0, 0), CEZ_TZ))
+
+
+def test_dict_round_trip() -> None:
+    """A stored schedule restores to an equal one."""
+    schedule = _schedule()
+    assert HdoSchedule.from_dict(schedule.as_dict()) == schedule
+
+
+def test_windows() -> None:
+    """Windows are clipped to the range and shorter ones dropped."""
+    schedule = HdoSchedule.from_intervals([(0, 30), (100, 220), (300, 360)], 0, 1440)
+    assert schedule.windows(10, 1440, 20) == [(10, 30), (100, 220), (300, 360)]
+    assert schedule.windows(10, 1440, 60) == [(100, 220), (300, 360)]
+    assert schedule.windows(0, 330, 60) == [(100, 220)]
+    assert schedule.windows(400, 1440, 1) == []
+
+
+def test_combine() -> None:
+    """Union and intersection of several signals, valid where all have data."""
+    first = HdoSchedule.from_intervals([(0, 60), (100, 200)], 0, 1440)
+    second = HdoSchedule.from_intervals([(30, 120), (200, 260)], 0, 2880)
+    third = HdoSchedule.from_intervals([(40, 50), (150, 250)], 0, 1440)
+
+    union = HdoSchedule.combine([first, second, third])
+    assert list(union.bounds) == [0, 260]
+    assert (union.valid_from, union.valid_until) == (0, 1440)
+
+    intersection = HdoSchedule.combine([first, second, third], intersection=True)
+    assert list(intersection.bounds) == [40, 50]
+
+    assert list(HdoSchedule.combine([first, second], intersection=True).bounds) == [
+        30, 60, 100, 120,
+    ]
+
+
+def test_combine_matches_minutes() -> None:
+    """The sweep agrees with the state of every signal minute by minute."""
+    schedules = [
+        HdoSchedule.from_intervals([(0, 30), (45, 90), (200, 300)], 0, 400),
+        HdoSchedule.from_intervals([(20, 50), (90, 120), (250, 260)], 0, 400),
+        HdoSchedule.from_intervals([(10, 100), (290, 310)], 0, 400),
+    ]
+
+    def low(schedule: HdoSchedule, minute: int) -> bool:
+        bounds = schedule.bounds
+        return any(bounds[i] <= minute < bounds[i + 1] for i in range(0, len(bounds), 2))
+
+    union = HdoSchedule.combine(schedules)
+    intersection = HdoSchedule.combine(schedules, intersection=True)
+    for minute in range(400):
+        states = [low(schedule, minute) for schedule in schedules]
+        assert low(union, minute) is any(states)
+        assert low(intersection, minute) is all(states)
@@ -0,0 +1,75 @@
+"""Tests for the CEZ HDO backoff and request budget."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.cez_hdo.throttle import Backoff, TokenBucket
+
+
+class FakeClock:
+    """Monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_token_bucket_limits_and_refills() -> None:
+    """A full bucket allows a burst, then one request per refill interval."""
+    clock = FakeClock()
+    bucket = TokenBucket(3, 10, clock)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == pytest.approx(10)
+
+    clock.now = 5
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == pytest.approx(5)
+
+    clock.now = 10
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_capacity() -> None:
+    """Idle time does not save up more than the capacity."""
+    clock = FakeClock()
+    bucket = TokenBucket(2, 1, clock)
+    clock.now = 1000
+    assert bucket.tokens == pytest.approx(2)
+    assert bucket.wait_time() == 0
+
+
+def test_backoff_grows_with_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Delays double per failure, with at least half of each delay kept."""
+    clock = FakeClock()
+    backoff = Backoff(10, 100, 5, clock)
+
+    monkeypatch.setattr("random.uniform", lambda low, high: high)
+    assert [backoff.record_failure() for _ in range(4)] == [10, 20, 40, 80]
+    assert backoff.retry_in() == 80
+    assert not backoff.is_open
+
+    monkeypatch.setattr("random.uniform", lambda low, high: low)
+    assert backoff.record_failure() == 50
+    assert backoff.is_open
+
+    clock.now = 20
+    assert backoff.retry_in() == 30
+
+
+def test_backoff_success_closes() -> None:
+    """A success closes the circuit and allows the next attempt right away."""
+    backoff = Backoff(10, 100, 2, FakeClock())
+    backoff.record_failure()
+    backoff.record_failure()
+    assert backoff.is_open
+
+    backoff.record_success()
+    assert not backoff.is_open
+    assert backoff.failures == 0
+    assert backoff.retry_in() == 0